@@ -1,57 +1,62 @@
 # Configurações do projeto TC1 - Monitoramento de Ativos
 
+from types import MappingProxyType
+
+# As configurações são dicionários congelados (MappingProxyType, somente leitura):
+# acesso por chave como antes, ex.: SHAKE_CONFIG['intensidade_min']
+
 # Configurações do problema
-PROBLEMA_CONFIG = {
+PROBLEMA_CONFIG = MappingProxyType({
     'n_ativos': 125,
     'm_bases': 14,
     's_equipes': 8,
     'eta': 0.2,  # Percentual mínimo de ativos por equipe
-}
+})
 
 # Configurações do algoritmo VNS
-VNS_CONFIG = {
-    'versao_rapida': {
+VNS_CONFIG = MappingProxyType({
+    'versao_rapida': MappingProxyType({
         'max_iter': 100,
         'n_execucoes': 2,
         'tempo_estimado': '1-2 minutos'
-    },
-    'versao_longo_prazo': {
+    }),
+    'versao_longo_prazo': MappingProxyType({
         'max_iter': 500,
         'n_execucoes': 10,
         'tempo_estimado': '30-60 minutos'
-    }
-}
+    })
+})
 
 # Configurações de parada
-PARADA_CONFIG = {
+PARADA_CONFIG = MappingProxyType({
     'iteracoes_sem_melhoria_max': 50,
     'iteracao_minima_parada': 100
-}
+})
 
 # Configurações de shake
-SHAKE_CONFIG = {
+SHAKE_CONFIG = MappingProxyType({
     'intensidade_min': 0.3,
     'intensidade_max': 0.8,
     'perturbacoes_min': 5,
     'perturbacoes_max': 20
-}
+})
 
 # Configurações de busca local
-BUSCA_LOCAL_CONFIG = {
+BUSCA_LOCAL_CONFIG = MappingProxyType({
     'n_testes_max': 30,
     'bases_proximas_max': 3,
     'trocas_equipes_max': 10
-}
+})
 
 # Caminhos dos arquivos
-PATHS = {
+PATHS = MappingProxyType({
     'dados': 'data/probdata.csv',
     'resultados_graficos': 'results/graficos/',
     'resultados_relatorios': 'results/relatorios/'
-}
+})
 
 # Coordenadas das bases (conforme especificação)
-BASES_COORDS = {
+BASES_COORDS = MappingProxyType({
     1: (-20.42356922351763, -43.85662128864406),   # Mina de Segredo
     2: (-20.41984991094628, -43.87807289747346),   # Mina de Fábrica
     3: (-20.21903360119097, -43.86799823383877),   # Mina do Pico
@@ -66,5 +71,5 @@ BASES_COORDS = {
     12: (-19.86222243086092, -43.79440046882095),  # Mina Córrego do Meio
     13: (-20.12490857385939, -44.12537961904606),  # Mina de Córrego do Feijão
     14: (-20.08768706286346, -43.94249431874169)   # Mina Tamanduá
-}
+})
 
@@ -11,13 +11,23 @@ sys.path.insert(0, 'src')
 
 # Importa e executa
 from src.monitoramento_ativos_base import main
+from src.log_progresso import configurar_log_progresso
 
 if __name__ == "__main__":
-    print("="*80, flush=True)
-    print("EXECUTANDO OTIMIZACAO MONO-OBJETIVO - PARTE 1", flush=True)
-    print("Configuracao atual: 3 execucoes x 200 iteracoes (~5-10 minutos)", flush=True)
-    print("="*80, flush=True)
-    print("", flush=True)
+    # Progresso do VNS (logger dos módulos em src/): INFO mostra início, iterações e parada;
+    # use logging.DEBUG para ver também shake e VND em detalhe
+    configurar_log_progresso()
+    
+    # Banner em uma única escrita (um flush só, antes do processamento começar)
+    sys.stdout.write("\n".join([
+        "="*80,
+        "EXECUTANDO OTIMIZACAO MONO-OBJETIVO - PARTE 1",
+        "Configuracao atual: 3 execucoes x 200 iteracoes (~5-10 minutos)",
+        "="*80,
+        "",
+        "",
+    ]))
+    sys.stdout.flush()
     
     main()
 
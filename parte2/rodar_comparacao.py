@@ -5,29 +5,21 @@ Este script carrega os resultados dos dois métodos e gera um gráfico comparati
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from src.monitoramento_ativos_base import MonitoramentoAtivosCompleto
 import os
+from pathlib import Path
 
 def carregar_resultados(arquivo_pw, arquivo_pe):
     """
-    Carrega resultados dos arquivos de relatório.
+    Carrega as fronteiras salvas em .npy por rodar_pw.py e rodar_pe.py.
     
     Args:
-        arquivo_pw: Caminho para relatório Pw
-        arquivo_pe: Caminho para relatório Pε
+        arquivo_pw: Caminho para fronteira Pw (.npy)
+        arquivo_pe: Caminho para fronteira Pε (.npy)
         
     Returns:
         Tupla (solucoes_pw, solucoes_pe)
     """
-    # Esta função é um placeholder - na prática, seria melhor salvar
-    # os arrays numpy diretamente usando np.save() nos scripts principais
-    
-    print("AVISO: Esta é uma versão simplificada.")
-    print("Para melhor funcionamento, execute rodar_pw.py e rodar_pe.py primeiro")
-    print("e salve os resultados em formato .npy")
-    
-    return None, None
+    return np.load(arquivo_pw, mmap_mode='r'), np.load(arquivo_pe, mmap_mode='r')
 
 
 def comparar_metodos():
@@ -38,37 +30,38 @@ def comparar_metodos():
     print("COMPARAÇÃO: WEIGHTED SUM (Pw) vs ε-CONSTRAINT (Pε)")
     print("="*80)
     
-    # Para usar este script, primeiro execute rodar_pw.py e rodar_pe.py
-    # e depois salve os resultados usando:
-    #   np.save('resultados/dados/fronteira_pw.npy', solucoes_pw)
-    #   np.save('resultados/dados/fronteira_pe.npy', solucoes_pe)
-    
+    # Os arquivos abaixo são gerados automaticamente por rodar_pw.py e rodar_pe.py
     arquivo_pw = 'resultados/dados/fronteira_pw.npy'
     arquivo_pe = 'resultados/dados/fronteira_pe.npy'
     
-    if not os.path.exists(arquivo_pw) or not os.path.exists(arquivo_pe):
+    faltando = [p for p in (Path(arquivo_pw), Path(arquivo_pe)) if not p.is_file()]
+    if faltando:
         print("\nERRO: Arquivos de dados não encontrados!")
-        print(f"  Esperado: {arquivo_pw}")
-        print(f"  Esperado: {arquivo_pe}")
+        for p in faltando:
+            print(f"  Esperado: {p.as_posix()}")
         print("\nPara gerar estes arquivos, execute primeiro:")
         print("  1. python rodar_pw.py")
         print("  2. python rodar_pe.py")
-        print("\nE adicione ao final de cada script:")
-        print("  os.makedirs('resultados/dados', exist_ok=True)")
-        print("  np.save('resultados/dados/fronteira_pw.npy', resultados['fronteira_final'])")
         print()
         return
     
     # Carrega resultados
     print("\nCarregando resultados...")
-    solucoes_pw = np.load(arquivo_pw)
-    solucoes_pe = np.load(arquivo_pe)
+    
+    # Imports pesados só depois de confirmar que há dados para comparar
+    import matplotlib
+    matplotlib.use('Agg')  # Backend sem interface gráfica: os gráficos são apenas salvos em PNG
+    import matplotlib.pyplot as plt
+    plt.rcParams['figure.max_open_warning'] = 0
+    from src.cache_problema import carregar_problema
+    
+    solucoes_pw, solucoes_pe = carregar_resultados(arquivo_pw, arquivo_pe)
     
     print(f"  Pw: {len(solucoes_pw)} soluções")
     print(f"  Pε: {len(solucoes_pe)} soluções")
     
     # Carrega visualizador
-    problema = MonitoramentoAtivosCompleto('data/probdata.csv')
+    problema = carregar_problema('data/probdata.csv')
     
     # Gera gráfico comparativo
     print("\nGerando gráfico comparativo...")
@@ -6,22 +6,55 @@ Execute: python rodar_f2.py
 import sys
 import os
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sem interface gráfica: os gráficos são apenas salvos em PNG
+from concurrent.futures import ProcessPoolExecutor
 
 # Adiciona src ao path
 sys.path.insert(0, 'src')
 
-from src.monitoramento_ativos_base import MonitoramentoAtivosCompleto
+from src.log_progresso import configurar_log_progresso
+from src.cache_problema import carregar_problema, inicializar_worker, problema_do_worker
+from src.persistencia import salvar_arrays
+
+# Semente das execuções (None = nova a cada rodada; a usada é impressa para poder repetir a rodada)
+SEMENTE = None
+
+def _executar_vns_f2(execucao, entropia):
+    """
+    Executa uma execução independente do VNS para F2 dentro de um worker.
+    
+    Args:
+        execucao: Índice da execução; junto com a entropia da rodada define a semente
+            desta execução, então o resultado não depende de qual worker a executa
+        entropia: Entropia da SeedSequence da rodada
+    
+    Returns:
+        Dicionário de resultados do VNS
+    """
+    problema = problema_do_worker()
+    problema.semear(np.random.SeedSequence(entropia, spawn_key=(execucao,)))
+    return problema.algoritmo_vns.vns(
+        funcao_objetivo='f2',
+        max_iter=500,
+        max_iter_sem_melhoria=5
+    )
 
 def main_f2_only():
     """Função principal para otimizar apenas F2."""
-    print("="*80, flush=True)
-    print("EXECUTANDO OTIMIZACAO DE F2 (Minimizar Número de Equipes)", flush=True)
-    print("="*80, flush=True)
-    print("", flush=True)
+    # Banner em uma única escrita (um flush só, antes de carregar os dados)
+    sys.stdout.write("\n".join([
+        "="*80,
+        "EXECUTANDO OTIMIZACAO DE F2 (Minimizar Número de Equipes)",
+        "="*80,
+        "",
+        "Carregando dados...",
+        "",
+    ]))
+    sys.stdout.flush()
     
     # Inicializa o problema
-    print("Carregando dados...", flush=True)
-    monitoramento = MonitoramentoAtivosCompleto('data/probdata.csv')
+    monitoramento = carregar_problema('data/probdata.csv')
     
     if monitoramento.dados.empty:
         print("Erro: Não foi possível carregar os dados.")
@@ -47,6 +80,10 @@ def main_f2_only():
     n_execucoes = 5
     print(f"Configuração: {n_execucoes} execuções × 500 iterações (max)")
     print(f"Critério de parada: 5 iterações sem melhoria")
+    
+    # Uma entropia por rodada; cada execução deriva dela a sua semente (reprodutível)
+    entropia = np.random.SeedSequence(SEMENTE).entropy
+    print(f"Semente (SEMENTE): {entropia}")
     print("")
     
     # Executa apenas F2
@@ -55,44 +92,54 @@ def main_f2_only():
     print("="*80)
     print("")
     
-    execucoes_f2 = []
-    for execucao in range(n_execucoes):
+    # As execuções são independentes: roda todas em paralelo (um processo por execução)
+    n_workers = min(n_execucoes, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=inicializar_worker,
+                             initargs=('data/probdata.csv',)) as executor:
+        execucoes_f2 = list(executor.map(_executar_vns_f2, range(n_execucoes), [entropia] * n_execucoes))
+    
+    for execucao, resultado in enumerate(execucoes_f2):
         print(f"\n{'='*60}")
         print(f"EXECUÇÃO {execucao + 1}/{n_execucoes} de F2")
         print(f"{'='*60}")
         
-        resultado = monitoramento.algoritmo_vns.vns(
-            funcao_objetivo='f2',
-            max_iter=500,
-            max_iter_sem_melhoria=5
-        )
-        
-        execucoes_f2.append(resultado)
+        # O histórico completo vai para disco; em memória fica só o número de iterações
+        historico = resultado.pop('historico')
+        salvar_arrays(f'resultados/dados/hist_f2_exec{execucao + 1}.npz',
+                      historico=np.asarray(historico, dtype=np.float32))
+        resultado['n_iter'] = len(historico)
         
         # Mostra resultado
         equipes_usadas = int(resultado['valor_objetivo'])
         print(f"\n  ✓ Resultado: {equipes_usadas} equipes")
-        print(f"  ✓ Iterações: {len(resultado['historico'])}")
+        print(f"  ✓ Iterações: {resultado['n_iter']}")
         
         # Verifica viabilidade
         x_ij = resultado['x_ij']
         y_jk = resultado['y_jk']
         h_ik = resultado['h_ik']
         
-        viavel = monitoramento.funcoes_objetivo.verificar_restricoes(x_ij, y_jk, h_ik)
+        viavel = monitoramento.funcoes_objetivo.verificar_restricoes_cache(x_ij, y_jk, h_ik)
         print(f"  ✓ Solução viável: {'SIM' if viavel else 'NÃO'}")
         
+        # Matrizes binárias -> uint8 (1/8 dos bytes lidos nas reduções abaixo)
+        x_ij, y_jk, h_ik = (m.astype(np.uint8, copy=False) for m in (x_ij, y_jk, h_ik))
+        
+        # Salva as matrizes da execução (uint8 comprimido)
+        salvar_arrays(f'resultados/dados/f2_exec{execucao + 1}.npz', x_ij=x_ij, y_jk=y_jk, h_ik=h_ik)
+        
         # Mostra distribuição
-        ativos_por_equipe = np.sum(h_ik, axis=0)
+        ativos_por_equipe = h_ik.sum(axis=0, dtype=np.int32)
         equipes_ativas = np.where(ativos_por_equipe > 0)[0]
-        bases_usadas = np.sum(np.sum(y_jk, axis=1) > 0)
+        bases_usadas = int(np.count_nonzero(y_jk.sum(axis=1, dtype=np.int32)))
         
         print(f"  ✓ Bases usadas: {bases_usadas}")
         print(f"  ✓ Distribuição de ativos por equipe:")
-        for k in equipes_ativas:
-            n_ativos_eq = int(ativos_por_equipe[k])
-            base_eq = np.where(y_jk[:, k] == 1)[0][0] + 1
-            print(f"      - Equipe {k}: {n_ativos_eq} ativos (base {base_eq})")
+        contagens = ativos_por_equipe[equipes_ativas]
+        bases_equipes = y_jk.argmax(axis=0)[equipes_ativas] + 1
+        print("\n".join(f"      - Equipe {k}: {c} ativos (base {b})"
+                        for k, c, b in zip(equipes_ativas, contagens, bases_equipes)))
     
     # Estatísticas finais
     print("\n" + "="*80)
@@ -154,6 +201,8 @@ def main_f2_only():
     print("  - resultados/graficos/melhor_solucao_f2.png")
     print("  - resultados/graficos/mapa_geografico_f2.png")
     print("  - resultados/relatorios/relatorio_f2_only.txt")
+    print(f"  - resultados/dados/f2_exec1.npz ... f2_exec{n_execucoes}.npz")
+    print(f"  - resultados/dados/hist_f2_exec1.npz ... hist_f2_exec{n_execucoes}.npz")
     print("")
 
 def gerar_relatorio_f2(monitoramento, resultados, melhor_exec):
@@ -188,7 +237,7 @@ def gerar_relatorio_f2(monitoramento, resultados, melhor_exec):
     relatorio.append("MELHOR SOLUÇÃO ENCONTRADA:")
     melhor_valor = int(melhor_exec['valor_objetivo'])
     relatorio.append(f"  - Número de equipes: {melhor_valor}")
-    relatorio.append(f"  - Iterações até convergência: {len(melhor_exec['historico'])}")
+    relatorio.append(f"  - Iterações até convergência: {melhor_exec['n_iter']}")
     
     x_ij = melhor_exec['x_ij']
     y_jk = melhor_exec['y_jk']
@@ -198,25 +247,26 @@ def gerar_relatorio_f2(monitoramento, resultados, melhor_exec):
     f1_valor = monitoramento.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
     relatorio.append(f"  - F1 (distância total): {f1_valor:.2f}")
     
-    viavel = monitoramento.funcoes_objetivo.verificar_restricoes(x_ij, y_jk, h_ik)
+    viavel = monitoramento.funcoes_objetivo.verificar_restricoes_cache(x_ij, y_jk, h_ik)
     relatorio.append(f"  - Viável: {'SIM' if viavel else 'NÃO'}")
+    x_ij, y_jk, h_ik = (m.astype(np.uint8, copy=False) for m in (x_ij, y_jk, h_ik))
     relatorio.append("")
     
     # Distribuição
     relatorio.append("DISTRIBUIÇÃO DA MELHOR SOLUÇÃO:")
-    ativos_por_equipe = np.sum(h_ik, axis=0)
+    ativos_por_equipe = h_ik.sum(axis=0, dtype=np.int32)
     equipes_ativas = np.where(ativos_por_equipe > 0)[0]
-    bases_usadas = np.sum(np.sum(y_jk, axis=1) > 0)
+    bases_usadas = int(np.count_nonzero(y_jk.sum(axis=1, dtype=np.int32)))
     
     relatorio.append(f"  - Bases utilizadas: {bases_usadas}")
     relatorio.append(f"  - Equipes utilizadas: {len(equipes_ativas)}")
     relatorio.append("")
     relatorio.append("  Distribuição por equipe:")
     
-    for k in equipes_ativas:
-        n_ativos_eq = int(ativos_por_equipe[k])
-        base_eq = np.where(y_jk[:, k] == 1)[0][0] + 1
-        relatorio.append(f"    Equipe {k}: {n_ativos_eq} ativos (base {base_eq})")
+    contagens = ativos_por_equipe[equipes_ativas]
+    bases_equipes = y_jk.argmax(axis=0)[equipes_ativas] + 1
+    relatorio.extend(f"    Equipe {k}: {c} ativos (base {b})"
+                     for k, c, b in zip(equipes_ativas, contagens, bases_equipes))
     
     relatorio.append("")
     relatorio.append("="*80)
@@ -224,5 +274,7 @@ def gerar_relatorio_f2(monitoramento, resultados, melhor_exec):
     return "\n".join(relatorio)
 
 if __name__ == "__main__":
+    # Progresso do VNS (início, iterações e parada) dos workers na saída padrão
+    configurar_log_progresso()
     main_f2_only()
 
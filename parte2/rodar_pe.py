@@ -9,12 +9,47 @@ Entrega #2 - Otimização Multiobjetivo
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sem interface gráfica: os gráficos são apenas salvos em PNG
 import matplotlib.pyplot as plt
-from src.monitoramento_ativos_base import MonitoramentoAtivosCompleto
+from src.log_progresso import configurar_log_progresso
+from src.cache_problema import carregar_problema, inicializar_worker, problema_do_worker
 from src.funcoes_objetivo import nondominatedsolutions, selecionar_solucoes_distribuidas
+from src.persistencia import salvar_arrays
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+# Semente das execuções (None = nova a cada rodada; a usada é impressa para poder repetir a rodada)
+SEMENTE = None
+
+
+def _resolver_ponto_pe(tarefa):
+    """
+    Executa o VNS para um único valor de epsilon dentro de um worker.
+    
+    Args:
+        tarefa: Tupla (exec_num, idx, epsilon_2, entropia); (exec_num, idx) junto com a
+                entropia da rodada define a semente do subproblema, então o resultado
+                não depende de qual worker o executa
+    
+    Returns:
+        Tupla (f1, f2, feasible, violation)
+    """
+    exec_num, idx, epsilon_2, entropia = tarefa
+    problema = problema_do_worker()
+    problema.semear(np.random.SeedSequence(entropia, spawn_key=(exec_num, idx)))
+    resultado = problema.algoritmo_vns.vns_multiobjetivo(
+        modo='pe',
+        parametro={'epsilon_2': epsilon_2},
+        max_iter=300,  # Reduzido para performance
+        max_iter_sem_melhoria=5,
+        solucao_inicial=None
+    )
+    return resultado['f1'], resultado['f2'], resultado['feasible'], resultado['violation']
+
+
 def gerar_valores_epsilon(f2_min, f2_max, n_points=20):
     """
     Gera n_points valores de epsilon uniformemente distribuídos.
@@ -25,11 +60,9 @@ def gerar_valores_epsilon(f2_min, f2_max, n_points=20):
         n_points: Número de pontos na fronteira
         
     Returns:
-        Lista de valores epsilon
+        Array numpy com os valores epsilon
     """
-    step = (f2_max - f2_min) / (n_points - 1)
-    epsilon_values = [f2_min + i * step for i in range(n_points)]
-    return epsilon_values
+    return np.linspace(f2_min, f2_max, n_points)
 
 
 def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
@@ -49,7 +82,7 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
     
     # Carrega dados do problema
     print("Carregando dados do problema...")
-    problema = MonitoramentoAtivosCompleto('data/probdata.csv')
+    problema = carregar_problema('data/probdata.csv')
     
     # Define ranges dos objetivos (baseados nos resultados da Entrega #1)
     f1_min = 636.91   # Melhor distância encontrada
@@ -66,9 +99,25 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
     print(f"\nGerados {len(epsilon_values)} valores de epsilon")
     print(f"  Epsilon: [{epsilon_values[0]:.2f}, {epsilon_values[-1]:.2f}]")
     
+    # Uma entropia por rodada; cada subproblema deriva dela a sua semente (reprodutível)
+    entropia = np.random.SeedSequence(SEMENTE).entropy
+    print(f"\nSemente (SEMENTE): {entropia}")
+    
+    # Todos os pares (execução, epsilon) são independentes: resolve em paralelo
+    tarefas = [(exec_num, idx, epsilon_2, entropia)
+               for exec_num in range(n_execucoes) for idx, epsilon_2 in enumerate(epsilon_values)]
+    n_workers = min(len(tarefas), os.cpu_count() or 1)
+    print(f"\nResolvendo {len(tarefas)} subproblemas em {n_workers} processo(s)...")
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=inicializar_worker,
+                             initargs=('data/probdata.csv',)) as executor:
+        resultados_pontos = list(executor.map(_resolver_ponto_pe, tarefas))
+    
     # Armazena resultados de todas execuções
     todas_fronteiras = []  # Lista de fronteiras (uma por execução)
-    todas_solucoes = []    # Lista de todas as soluções para fronteira combinada
+    # Todas as soluções para fronteira combinada (pré-alocado; válidas até n_solucoes)
+    todas_solucoes = np.empty((n_execucoes * n_pontos_fronteira, 2), dtype=np.float64)
+    n_solucoes = 0
     
     # Loop de execuções
     for exec_num in range(n_execucoes):
@@ -76,47 +125,37 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
         print(f"EXECUÇÃO {exec_num + 1}/{n_execucoes}")
         print(f"{'='*80}")
         
-        fronteira_exec = []  # Soluções desta execução
+        fronteira_exec = np.empty((n_pontos_fronteira, 2), dtype=np.float64)  # Soluções desta execução
+        n_exec = 0
         
         # Loop sobre valores de epsilon
         for idx, epsilon_2 in enumerate(epsilon_values):
             print(f"\n  [{exec_num+1}/{n_execucoes}] Ponto {idx+1}/{n_pontos_fronteira} | epsilon2={epsilon_2:.3f}")
             
-            # Prepara parâmetros para o VNS
-            parametros = {
-                'epsilon_2': epsilon_2
-            }
-            
-            # Executa VNS multi-objetivo
-            resultado = problema.algoritmo_vns.vns_multiobjetivo(
-                modo='pe',
-                parametro=parametros,
-                max_iter=300,  # Reduzido para performance
-                max_iter_sem_melhoria=5,
-                solucao_inicial=None
-            )
-            
-            # Armazena resultado
-            f1 = resultado['f1']
-            f2 = resultado['f2']
-            feasible = resultado['feasible']
+            # Resultado do VNS multi-objetivo para este ponto
+            f1, f2, feasible, violation = resultados_pontos[exec_num * len(epsilon_values) + idx]
             
+            armazenar = False
             if feasible:
                 print(f"    OK Solucao viavel: f1={f1:.2f}, f2={f2:.2f}")
-                fronteira_exec.append([f1, f2])
-                todas_solucoes.append([f1, f2])
+                armazenar = True
             else:
-                print(f"    XX Solucao inviavel (violacao={resultado['violation']:.4f})")
+                print(f"    XX Solucao inviavel (violacao={violation:.4f})")
                 # Para Pe, as vezes nao e possivel satisfazer restricoes muito restritivas
                 # Mas ainda assim armazenamos a solucao para analise
-                if resultado['violation'] < 1.0:  # Se violacao for pequena
+                if violation < 1.0:  # Se violacao for pequena
                     print(f"    -> Armazenando solucao com violacao pequena")
-                    fronteira_exec.append([f1, f2])
-                    todas_solucoes.append([f1, f2])
+                    armazenar = True
+            
+            if armazenar:
+                fronteira_exec[n_exec] = (f1, f2)
+                todas_solucoes[n_solucoes] = (f1, f2)
+                n_exec += 1
+                n_solucoes += 1
         
         # Aplica non-dominated sorting à fronteira desta execução
-        if len(fronteira_exec) > 0:
-            fronteira_array = np.array(fronteira_exec)
+        if n_exec > 0:
+            fronteira_array = fronteira_exec[:n_exec]
             indices_nd = nondominatedsolutions(fronteira_array)
             fronteira_nd = fronteira_array[indices_nd]
             
@@ -130,7 +169,7 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
             todas_fronteiras.append(fronteira_final)
             
             print(f"\n  Execução {exec_num+1} concluída:")
-            print(f"    Total de soluções: {len(fronteira_exec)}")
+            print(f"    Total de soluções: {n_exec}")
             print(f"    Não-dominadas: {len(fronteira_nd)}")
             print(f"    Fronteira final: {len(fronteira_final)}")
         else:
@@ -141,8 +180,8 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
     print("TODAS AS EXECUCOES CONCLUIDAS")
     print(f"{'='*80}")
     
-    # Converte para arrays numpy
-    todas_solucoes_array = np.array(todas_solucoes)
+    # Apenas as linhas preenchidas
+    todas_solucoes_array = todas_solucoes[:n_solucoes]
     
     # Cria diretórios para resultados
     os.makedirs('resultados/graficos/multiobjetivo', exist_ok=True)
@@ -166,50 +205,62 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
     )
     plt.close(fig2)
     
+    # Salva os arrays numpy para reuso (ex.: rodar_comparacao.py)
+    os.makedirs('resultados/dados', exist_ok=True)
+    np.save('resultados/dados/fronteira_pe.npy', solucoes_finais)
+    salvar_arrays('resultados/dados/fronteiras_pe_all.npz', *todas_fronteiras)
+    salvar_arrays('resultados/dados/todas_solucoes_pe.npz', todas_solucoes=todas_solucoes_array)
+    
     # Salva resultados em arquivo
     print("\nGerando relatório...")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Monta o relatório em memória e grava de uma vez só
+    buf = []
+    buf.append("="*80 + "\n")
+    buf.append("ENTREGA #2: OTIMIZAÇÃO MULTIOBJETIVO - MÉTODO ε-CONSTRAINT (Pε)\n")
+    buf.append("="*80 + "\n\n")
+    buf.append(f"Data/Hora: {timestamp}\n\n")
+    
+    buf.append("CONFIGURAÇÃO:\n")
+    buf.append(f"  Número de execuções: {n_execucoes}\n")
+    buf.append(f"  Pontos por fronteira: {n_pontos_fronteira}\n")
+    buf.append(f"  Objetivo principal: Minimizar f1 (distância)\n")
+    buf.append(f"  Restrição: f2 <= epsilon_2\n")
+    buf.append(f"  Ranges dos objetivos:\n")
+    buf.append(f"    f1: [{f1_min:.2f}, {f1_max:.2f}] km\n")
+    buf.append(f"    f2: [{f2_min:.0f}, {f2_max:.0f}] equipes\n")
+    buf.append(f"    epsilon_2: [{epsilon_values[0]:.2f}, {epsilon_values[-1]:.2f}]\n\n")
+    
+    buf.append("RESULTADOS POR EXECUÇÃO:\n")
+    for i, fronteira in enumerate(todas_fronteiras):
+        buf.append(f"\n  Execução {i+1}:\n")
+        if len(fronteira) > 0:
+            buf.append(f"    Número de soluções na fronteira: {len(fronteira)}\n")
+            buf.append(f"    f1 mínimo: {np.min(fronteira[:, 0]):.2f} km\n")
+            buf.append(f"    f1 máximo: {np.max(fronteira[:, 0]):.2f} km\n")
+            buf.append(f"    f2 mínimo: {np.min(fronteira[:, 1]):.2f} equipes\n")
+            buf.append(f"    f2 máximo: {np.max(fronteira[:, 1]):.2f} equipes\n")
+        else:
+            buf.append("    Nenhuma solução encontrada\n")
+    
+    buf.append("\n" + "="*80 + "\n")
+    buf.append("FRONTEIRA FINAL COMBINADA:\n")
+    buf.append("="*80 + "\n\n")
+    buf.append(f"Total de soluções encontradas: {len(todas_solucoes_array)}\n")
+    buf.append(f"Soluções na fronteira final: {len(solucoes_finais)}\n\n")
+    
+    buf.append("SOLUÇÕES DA FRONTEIRA FINAL:\n")
+    buf.append("  #  |      f1 (km)  |  f2 (equipes)\n")
+    buf.append("-"*45 + "\n")
+    solucoes_ordenadas = solucoes_finais[np.argsort(solucoes_finais[:, 0])]
+    indices = np.arange(1, len(solucoes_ordenadas) + 1)[:, None]
+    tabela = io.StringIO()
+    np.savetxt(tabela, np.hstack([indices, solucoes_ordenadas]), fmt='  %2d |  %11.2f  |  %11.2f')
+    buf.append(tabela.getvalue())
+    
     with open('resultados/relatorios/relatorio_pe.txt', 'w', encoding='utf-8') as f:
-        f.write("="*80 + "\n")
-        f.write("ENTREGA #2: OTIMIZAÇÃO MULTIOBJETIVO - MÉTODO ε-CONSTRAINT (Pε)\n")
-        f.write("="*80 + "\n\n")
-        f.write(f"Data/Hora: {timestamp}\n\n")
-        
-        f.write("CONFIGURAÇÃO:\n")
-        f.write(f"  Número de execuções: {n_execucoes}\n")
-        f.write(f"  Pontos por fronteira: {n_pontos_fronteira}\n")
-        f.write(f"  Objetivo principal: Minimizar f1 (distância)\n")
-        f.write(f"  Restrição: f2 <= epsilon_2\n")
-        f.write(f"  Ranges dos objetivos:\n")
-        f.write(f"    f1: [{f1_min:.2f}, {f1_max:.2f}] km\n")
-        f.write(f"    f2: [{f2_min:.0f}, {f2_max:.0f}] equipes\n")
-        f.write(f"    epsilon_2: [{epsilon_values[0]:.2f}, {epsilon_values[-1]:.2f}]\n\n")
-        
-        f.write("RESULTADOS POR EXECUÇÃO:\n")
-        for i, fronteira in enumerate(todas_fronteiras):
-            f.write(f"\n  Execução {i+1}:\n")
-            if len(fronteira) > 0:
-                f.write(f"    Número de soluções na fronteira: {len(fronteira)}\n")
-                f.write(f"    f1 mínimo: {np.min(fronteira[:, 0]):.2f} km\n")
-                f.write(f"    f1 máximo: {np.max(fronteira[:, 0]):.2f} km\n")
-                f.write(f"    f2 mínimo: {np.min(fronteira[:, 1]):.2f} equipes\n")
-                f.write(f"    f2 máximo: {np.max(fronteira[:, 1]):.2f} equipes\n")
-            else:
-                f.write("    Nenhuma solução encontrada\n")
-        
-        f.write("\n" + "="*80 + "\n")
-        f.write("FRONTEIRA FINAL COMBINADA:\n")
-        f.write("="*80 + "\n\n")
-        f.write(f"Total de soluções encontradas: {len(todas_solucoes_array)}\n")
-        f.write(f"Soluções na fronteira final: {len(solucoes_finais)}\n\n")
-        
-        f.write("SOLUÇÕES DA FRONTEIRA FINAL:\n")
-        f.write("  #  |      f1 (km)  |  f2 (equipes)\n")
-        f.write("-"*45 + "\n")
-        solucoes_ordenadas = solucoes_finais[np.argsort(solucoes_finais[:, 0])]
-        for i, sol in enumerate(solucoes_ordenadas):
-            f.write(f"  {i+1:2d} |  {sol[0]:11.2f}  |  {sol[1]:11.2f}\n")
+        f.write(''.join(buf))
     
     print(f"Relatório salvo em: resultados/relatorios/relatorio_pe.txt")
     
@@ -220,6 +271,9 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
     print("  - resultados/graficos/multiobjetivo/fronteiras_pe_sobrepostas.png")
     print("  - resultados/graficos/multiobjetivo/fronteira_pe_final.png")
     print("  - resultados/relatorios/relatorio_pe.txt")
+    print("  - resultados/dados/fronteira_pe.npy")
+    print("  - resultados/dados/fronteiras_pe_all.npz")
+    print("  - resultados/dados/todas_solucoes_pe.npz")
     print()
     
     return {
@@ -230,6 +284,8 @@ def executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20):
 
 
 if __name__ == '__main__':
+    configurar_log_progresso()
+    
     # Executa otimização Pε
     resultados = executar_otimizacao_pe(n_execucoes=5, n_pontos_fronteira=20)
     
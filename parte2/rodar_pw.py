@@ -9,28 +9,69 @@ Entrega #2 - Otimização Multiobjetivo
 """
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend sem interface gráfica: os gráficos são apenas salvos em PNG
 import matplotlib.pyplot as plt
-from src.monitoramento_ativos_base import MonitoramentoAtivosCompleto
+from src.log_progresso import configurar_log_progresso
+from src.cache_problema import carregar_problema, inicializar_worker, problema_do_worker
 from src.funcoes_objetivo import nondominatedsolutions, selecionar_solucoes_distribuidas
+from src.persistencia import salvar_arrays
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-def gerar_vetores_peso(n_points=20):
+# Semente das execuções (None = nova a cada rodada; a usada é impressa para poder repetir a rodada)
+SEMENTE = None
+
+
+def _resolver_ponto_pw(tarefa):
     """
-    Gera n_points vetores de peso [w1, w2] onde w1 + w2 = 1.
+    Executa o VNS para um único vetor de pesos dentro de um worker.
     
     Args:
+        tarefa: Tupla (exec_num, idx, parametros, entropia). parametros é o dicionário com
+                w1, w2, c1, c2, os ranges de normalização dos objetivos e os pontos (f1, f2)
+                já conhecidos das execuções anteriores; (exec_num, idx) junto com a entropia
+                da rodada define a semente do subproblema, então o resultado não depende
+                de qual worker o executa
+    
+    Returns:
+        Tupla (f1, f2, feasible, violation)
+    """
+    exec_num, idx, parametros, entropia = tarefa
+    problema = problema_do_worker()
+    problema.semear(np.random.SeedSequence(entropia, spawn_key=(exec_num, idx)))
+    resultado = problema.algoritmo_vns.vns_multiobjetivo(
+        modo='pw',
+        parametro=parametros,
+        max_iter=300,  # Reduzido para performance
+        max_iter_sem_melhoria=5,
+        solucao_inicial=None
+    )
+    return resultado['f1'], resultado['f2'], resultado['feasible'], resultado['violation']
+
+
+def gerar_vetores_peso(f1_min, f1_max, f2_min, f2_max, n_points=20):
+    """
+    Gera n_points vetores de peso [w1, w2] onde w1 + w2 = 1, junto com os
+    coeficientes c1 = w1/(f1_max - f1_min) e c2 = w2/(f2_max - f2_min) usados
+    em F_w = c1*(f1 - f1_min) + c2*(f2 - f2_min).
+    
+    Args:
+        f1_min, f1_max, f2_min, f2_max: Limites para normalização
         n_points: Número de pontos na fronteira
         
     Returns:
-        Lista de tuplas (w1, w2)
+        Array numpy (n_points, 4) com as colunas [w1, w2, c1, c2]
     """
-    pesos = []
-    for i in range(n_points):
-        w1 = i / (n_points - 1)
-        w2 = 1.0 - w1
-        pesos.append((w1, w2))
-    return pesos
+    w1 = np.linspace(0.0, 1.0, n_points)
+    w2 = 1.0 - w1
+    faixa_f1 = f1_max - f1_min
+    faixa_f2 = f2_max - f2_min
+    c1 = w1 / faixa_f1 if faixa_f1 > 1e-10 else np.zeros(n_points)
+    c2 = w2 / faixa_f2 if faixa_f2 > 1e-10 else np.zeros(n_points)
+    return np.column_stack([w1, w2, c1, c2])
 
 
 def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
@@ -50,7 +91,7 @@ def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
     
     # Carrega dados do problema
     print("Carregando dados do problema...")
-    problema = MonitoramentoAtivosCompleto('data/probdata.csv')
+    problema = carregar_problema('data/probdata.csv')
     
     # Define ranges dos objetivos (baseados nos resultados da Entrega #1)
     # Esses valores devem ser ajustados com base nos seus resultados reais
@@ -64,85 +105,104 @@ def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
     print(f"  f2 (equipes): [{f2_min:.0f}, {f2_max:.0f}]")
     
     # Gera vetores de peso
-    vetores_peso = gerar_vetores_peso(n_pontos_fronteira)
+    vetores_peso = gerar_vetores_peso(f1_min, f1_max, f2_min, f2_max, n_pontos_fronteira)
     print(f"\nGerados {len(vetores_peso)} vetores de peso")
     
+    # Os vetores de peso de uma execução são independentes: cada execução é resolvida
+    # em paralelo, levando a fronteira das execuções anteriores (parada antecipada no VNS)
+    n_workers = min(n_pontos_fronteira, os.cpu_count() or 1)
+    print(f"\nResolvendo {n_pontos_fronteira} subproblemas por execução em {n_workers} processo(s)...")
+    
+    # Uma entropia por rodada; cada subproblema deriva dela a sua semente (reprodutível)
+    entropia = np.random.SeedSequence(SEMENTE).entropy
+    print(f"Semente (SEMENTE): {entropia}")
+    
     # Armazena resultados de todas execuções
     todas_fronteiras = []  # Lista de fronteiras (uma por execução)
-    todas_solucoes = []    # Lista de todas as soluções para fronteira combinada
+    # Resultado de cada subproblema em vetores separados (pré-alocados; válidos até n_solucoes),
+    # uma posição por (execução, vetor de pesos), viável ou não
+    todos_f1 = np.empty(n_execucoes * n_pontos_fronteira, dtype=np.float64)
+    todos_f2 = np.empty(n_execucoes * n_pontos_fronteira, dtype=np.float64)
+    todos_viaveis = np.empty(n_execucoes * n_pontos_fronteira, dtype=bool)
+    n_solucoes = 0
     
-    # Loop de execuções
-    for exec_num in range(n_execucoes):
-        print(f"\n{'='*80}")
-        print(f"EXECUÇÃO {exec_num + 1}/{n_execucoes}")
-        print(f"{'='*80}")
-        
-        fronteira_exec = []  # Soluções desta execução
-        
-        # Loop sobre vetores de peso
-        for idx, (w1, w2) in enumerate(vetores_peso):
-            print(f"\n  [{exec_num+1}/{n_execucoes}] Ponto {idx+1}/{n_pontos_fronteira} | w1={w1:.3f}, w2={w2:.3f}")
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=inicializar_worker,
+                             initargs=('data/probdata.csv',)) as executor:
+        # Loop de execuções
+        for exec_num in range(n_execucoes):
+            print(f"\n{'='*80}")
+            print(f"EXECUÇÃO {exec_num + 1}/{n_execucoes}")
+            print(f"{'='*80}")
             
-            # Prepara parâmetros para o VNS
-            parametros = {
-                'w1': w1,
-                'w2': w2,
-                'f1_min': f1_min,
-                'f1_max': f1_max,
-                'f2_min': f2_min,
-                'f2_max': f2_max
-            }
+            # Soluções viáveis não-dominadas já encontradas nas execuções anteriores
+            viaveis = todos_viaveis[:n_solucoes]
+            pontos_conhecidos = np.column_stack((todos_f1[:n_solucoes][viaveis], todos_f2[:n_solucoes][viaveis]))
+            pontos_conhecidos = pontos_conhecidos[nondominatedsolutions(pontos_conhecidos)]
             
-            # Executa VNS multi-objetivo
-            resultado = problema.algoritmo_vns.vns_multiobjetivo(
-                modo='pw',
-                parametro=parametros,
-                max_iter=300,  # Reduzido para performance
-                max_iter_sem_melhoria=5,
-                solucao_inicial=None
-            )
+            tarefas = [
+                (exec_num, idx,
+                 {'w1': w1, 'w2': w2, 'c1': c1, 'c2': c2,
+                  'f1_min': f1_min, 'f1_max': f1_max,
+                  'f2_min': f2_min, 'f2_max': f2_max,
+                  'pontos_conhecidos': pontos_conhecidos},
+                 entropia)
+                for idx, (w1, w2, c1, c2) in enumerate(vetores_peso)
+            ]
+            resultados_pontos = list(executor.map(_resolver_ponto_pw, tarefas,
+                                                  chunksize=max(1, len(tarefas) // (4 * n_workers))))
             
-            # Armazena resultado
-            f1 = resultado['f1']
-            f2 = resultado['f2']
-            feasible = resultado['feasible']
+            # Loop sobre vetores de peso
+            for idx, (w1, w2) in enumerate(vetores_peso[:, :2]):
+                print(f"\n  [{exec_num+1}/{n_execucoes}] Ponto {idx+1}/{n_pontos_fronteira} | w1={w1:.3f}, w2={w2:.3f}")
+                
+                # Resultado do VNS multi-objetivo para este ponto
+                f1, f2, feasible, violation = resultados_pontos[idx]
+                todos_f1[n_solucoes] = f1
+                todos_f2[n_solucoes] = f2
+                todos_viaveis[n_solucoes] = feasible
+                n_solucoes += 1
+                
+                if feasible:
+                    print(f"    OK Solucao viavel: f1={f1:.2f}, f2={f2:.2f}")
+                else:
+                    print(f"    XX Solucao inviavel (violacao={violation:.4f})")
             
-            if feasible:
-                print(f"    OK Solucao viavel: f1={f1:.2f}, f2={f2:.2f}")
-                fronteira_exec.append([f1, f2])
-                todas_solucoes.append([f1, f2])
-            else:
-                print(f"    XX Solucao inviavel (violacao={resultado['violation']:.4f})")
-        
-        # Aplica non-dominated sorting à fronteira desta execução
-        if len(fronteira_exec) > 0:
-            fronteira_array = np.array(fronteira_exec)
-            indices_nd = nondominatedsolutions(fronteira_array)
-            fronteira_nd = fronteira_array[indices_nd]
+            # Soluções viáveis desta execução (últimas n_pontos_fronteira posições)
+            bloco = slice(n_solucoes - n_pontos_fronteira, n_solucoes)
+            viaveis_exec = todos_viaveis[bloco]
+            n_exec = int(np.count_nonzero(viaveis_exec))
             
-            # Seleciona até 20 pontos bem distribuídos
-            if len(indices_nd) > 20:
-                indices_sel = selecionar_solucoes_distribuidas(fronteira_array, indices_nd, 20)
-                fronteira_final = fronteira_array[indices_sel]
+            # Aplica non-dominated sorting à fronteira desta execução
+            if n_exec > 0:
+                fronteira_array = np.column_stack((todos_f1[bloco][viaveis_exec], todos_f2[bloco][viaveis_exec]))
+                indices_nd = nondominatedsolutions(fronteira_array)
+                fronteira_nd = fronteira_array[indices_nd]
+                
+                # Seleciona até 20 pontos bem distribuídos
+                if len(indices_nd) > 20:
+                    indices_sel = selecionar_solucoes_distribuidas(fronteira_array, indices_nd, 20)
+                    fronteira_final = fronteira_array[indices_sel]
+                else:
+                    fronteira_final = fronteira_nd
+                
+                todas_fronteiras.append(fronteira_final)
+                
+                print(f"\n  Execução {exec_num+1} concluída:")
+                print(f"    Total de soluções: {n_exec}")
+                print(f"    Não-dominadas: {len(fronteira_nd)}")
+                print(f"    Fronteira final: {len(fronteira_final)}")
             else:
-                fronteira_final = fronteira_nd
-            
-            todas_fronteiras.append(fronteira_final)
-            
-            print(f"\n  Execução {exec_num+1} concluída:")
-            print(f"    Total de soluções: {len(fronteira_exec)}")
-            print(f"    Não-dominadas: {len(fronteira_nd)}")
-            print(f"    Fronteira final: {len(fronteira_final)}")
-        else:
-            print(f"\n  Execução {exec_num+1}: Nenhuma solução viável encontrada!")
-            todas_fronteiras.append(np.array([]))
+                print(f"\n  Execução {exec_num+1}: Nenhuma solução viável encontrada!")
+                todas_fronteiras.append(np.array([]))
     
     print(f"\n{'='*80}")
     print("TODAS AS EXECUÇÕES CONCLUÍDAS")
     print(f"{'='*80}")
     
-    # Converte para arrays numpy
-    todas_solucoes_array = np.array(todas_solucoes)
+    # Apenas as soluções viáveis, como pares (f1, f2)
+    viaveis = todos_viaveis[:n_solucoes]
+    todas_solucoes_array = np.column_stack((todos_f1[:n_solucoes][viaveis], todos_f2[:n_solucoes][viaveis]))
     
     # Cria diretórios para resultados
     os.makedirs('resultados/graficos/multiobjetivo', exist_ok=True)
@@ -166,47 +226,61 @@ def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
     )
     plt.close(fig2)
     
+    # Salva os arrays numpy para reuso (ex.: rodar_comparacao.py)
+    os.makedirs('resultados/dados', exist_ok=True)
+    np.save('resultados/dados/fronteira_pw.npy', solucoes_finais)
+    salvar_arrays('resultados/dados/fronteiras_pw_all.npz', *todas_fronteiras)
+    salvar_arrays('resultados/dados/todas_solucoes_pw.npz', todas_solucoes=todas_solucoes_array)
+    
     # Salva resultados em arquivo
     print("\nGerando relatório...")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Monta o relatório em memória e grava de uma vez só
+    buf = []
+    buf.append("="*80 + "\n")
+    buf.append("ENTREGA #2: OTIMIZAÇÃO MULTIOBJETIVO - MÉTODO WEIGHTED SUM (Pw)\n")
+    buf.append("="*80 + "\n\n")
+    buf.append(f"Data/Hora: {timestamp}\n\n")
+    
+    buf.append("CONFIGURAÇÃO:\n")
+    buf.append(f"  Número de execuções: {n_execucoes}\n")
+    buf.append(f"  Pontos por fronteira: {n_pontos_fronteira}\n")
+    buf.append(f"  Ranges dos objetivos:\n")
+    buf.append(f"    f1: [{f1_min:.2f}, {f1_max:.2f}] km\n")
+    buf.append(f"    f2: [{f2_min:.0f}, {f2_max:.0f}] equipes\n\n")
+    
+    buf.append("RESULTADOS POR EXECUÇÃO:\n")
+    for i, fronteira in enumerate(todas_fronteiras):
+        buf.append(f"\n  Execução {i+1}:\n")
+        if len(fronteira) > 0:
+            # Mínimos e máximos de (f1, f2) em uma redução cada
+            (f1_min_exec, f2_min_exec), (f1_max_exec, f2_max_exec) = fronteira.min(axis=0), fronteira.max(axis=0)
+            buf.append(f"    Número de soluções na fronteira: {len(fronteira)}\n"
+                       f"    f1 mínimo: {f1_min_exec:.2f} km\n"
+                       f"    f1 máximo: {f1_max_exec:.2f} km\n"
+                       f"    f2 mínimo: {f2_min_exec:.2f} equipes\n"
+                       f"    f2 máximo: {f2_max_exec:.2f} equipes\n")
+        else:
+            buf.append("    Nenhuma solução viável encontrada\n")
+    
+    buf.append("\n" + "="*80 + "\n")
+    buf.append("FRONTEIRA FINAL COMBINADA:\n")
+    buf.append("="*80 + "\n\n")
+    buf.append(f"Total de soluções encontradas: {len(todas_solucoes_array)}\n")
+    buf.append(f"Soluções na fronteira final: {len(solucoes_finais)}\n\n")
+    
+    buf.append("SOLUÇÕES DA FRONTEIRA FINAL:\n")
+    buf.append("  #  |      f1 (km)  |  f2 (equipes)\n")
+    buf.append("-"*45 + "\n")
+    solucoes_ordenadas = solucoes_finais[np.argsort(solucoes_finais[:, 0])]
+    indices = np.arange(1, len(solucoes_ordenadas) + 1)[:, None]
+    tabela = io.StringIO()
+    np.savetxt(tabela, np.hstack([indices, solucoes_ordenadas]), fmt='  %2d |  %11.2f  |  %11.2f')
+    buf.append(tabela.getvalue())
+    
     with open('resultados/relatorios/relatorio_pw.txt', 'w', encoding='utf-8') as f:
-        f.write("="*80 + "\n")
-        f.write("ENTREGA #2: OTIMIZAÇÃO MULTIOBJETIVO - MÉTODO WEIGHTED SUM (Pw)\n")
-        f.write("="*80 + "\n\n")
-        f.write(f"Data/Hora: {timestamp}\n\n")
-        
-        f.write("CONFIGURAÇÃO:\n")
-        f.write(f"  Número de execuções: {n_execucoes}\n")
-        f.write(f"  Pontos por fronteira: {n_pontos_fronteira}\n")
-        f.write(f"  Ranges dos objetivos:\n")
-        f.write(f"    f1: [{f1_min:.2f}, {f1_max:.2f}] km\n")
-        f.write(f"    f2: [{f2_min:.0f}, {f2_max:.0f}] equipes\n\n")
-        
-        f.write("RESULTADOS POR EXECUÇÃO:\n")
-        for i, fronteira in enumerate(todas_fronteiras):
-            f.write(f"\n  Execução {i+1}:\n")
-            if len(fronteira) > 0:
-                f.write(f"    Número de soluções na fronteira: {len(fronteira)}\n")
-                f.write(f"    f1 mínimo: {np.min(fronteira[:, 0]):.2f} km\n")
-                f.write(f"    f1 máximo: {np.max(fronteira[:, 0]):.2f} km\n")
-                f.write(f"    f2 mínimo: {np.min(fronteira[:, 1]):.2f} equipes\n")
-                f.write(f"    f2 máximo: {np.max(fronteira[:, 1]):.2f} equipes\n")
-            else:
-                f.write("    Nenhuma solução viável encontrada\n")
-        
-        f.write("\n" + "="*80 + "\n")
-        f.write("FRONTEIRA FINAL COMBINADA:\n")
-        f.write("="*80 + "\n\n")
-        f.write(f"Total de soluções encontradas: {len(todas_solucoes_array)}\n")
-        f.write(f"Soluções na fronteira final: {len(solucoes_finais)}\n\n")
-        
-        f.write("SOLUÇÕES DA FRONTEIRA FINAL:\n")
-        f.write("  #  |      f1 (km)  |  f2 (equipes)\n")
-        f.write("-"*45 + "\n")
-        solucoes_ordenadas = solucoes_finais[np.argsort(solucoes_finais[:, 0])]
-        for i, sol in enumerate(solucoes_ordenadas):
-            f.write(f"  {i+1:2d} |  {sol[0]:11.2f}  |  {sol[1]:11.2f}\n")
+        f.write(''.join(buf))
     
     print(f"Relatório salvo em: resultados/relatorios/relatorio_pw.txt")
     
@@ -217,6 +291,9 @@ def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
     print("  - resultados/graficos/multiobjetivo/fronteiras_pw_sobrepostas.png")
     print("  - resultados/graficos/multiobjetivo/fronteira_pw_final.png")
     print("  - resultados/relatorios/relatorio_pw.txt")
+    print("  - resultados/dados/fronteira_pw.npy")
+    print("  - resultados/dados/fronteiras_pw_all.npz")
+    print("  - resultados/dados/todas_solucoes_pw.npz")
     print()
     
     return {
@@ -227,6 +304,8 @@ def executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20):
 
 
 if __name__ == '__main__':
+    configurar_log_progresso()
+    
     # Executa otimização Pw
     resultados = executar_otimizacao_pw(n_execucoes=5, n_pontos_fronteira=20)
     
@@ -1,10 +1,40 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 from typing import Dict, Tuple, Optional, Callable
 
+try:
+    from .cache_problema import inicializar_worker, problema_do_worker
+except ImportError:
+    # Para execução direta do arquivo
+    from cache_problema import inicializar_worker, problema_do_worker
+
+# Progresso do VNS: INFO (início, a cada 10 iterações, parada) e DEBUG (shake, VND, melhorias)
+logger = logging.getLogger(__name__)
+
+def _executar_vns(funcao_objetivo, execucao, entropia):
+    """
+    Executa uma execução independente do VNS mono-objetivo dentro de um worker.
+    
+    Args:
+        funcao_objetivo: 'f1' ou 'f2'
+        execucao: Índice da execução; junto com a entropia define a semente da execução,
+                  então o resultado não depende de qual worker a executa
+        entropia: Entropia da rodada (np.random.SeedSequence)
+    
+    Returns:
+        Dicionario com resultados do VNS
+    """
+    problema = problema_do_worker()
+    problema.semear(np.random.SeedSequence(entropia, spawn_key=(execucao,)))
+    return problema.algoritmo_vns.vns(funcao_objetivo, max_iter=500, max_iter_sem_melhoria=5)
+
 class AlgoritmoVNS:
     # Classe que implementa o algoritmo VNS (Variable Neighborhood Search) para otimização
     
-    def __init__(self, monitoramento):
+    def __init__(self, monitoramento, seed: Optional[int] = None):
         # Pega os dados do problema e as classes necessárias
         self.monitoramento = monitoramento
         self.n_ativos = monitoramento.n_ativos
@@ -15,6 +45,10 @@ class AlgoritmoVNS:
         self.funcoes_objetivo = monitoramento.funcoes_objetivo
         self.busca_local = monitoramento.busca_local
         self.gerador_solucoes = monitoramento.gerador_solucoes
+        
+        # Gerador aleatório do processo, criado uma vez (seed fixa só para reprodutibilidade);
+        # MonitoramentoAtivosCompleto.semear o compartilha com a busca local e o gerador de soluções
+        self.rng = np.random.default_rng(seed)
     
     def vns(self, funcao_objetivo: str = 'f1', max_iter: int = 1000, max_iter_sem_melhoria: int = 50) -> Dict:
         """
@@ -29,20 +63,19 @@ class AlgoritmoVNS:
         Returns:
             Dicionario com resultados
         """
-        print(f"  Iniciando GVNS para {funcao_objetivo}...", flush=True)
-        
-        # Define seed aleatoria para diversificacao
-        np.random.seed(None)
+        logger.info("  Iniciando GVNS para %s...", funcao_objetivo)
         
         # Solucao inicial
         x_ij, y_jk, h_ik = self.gerador_solucoes.gerar_solucao_inicial()
         
         # Aplica VND na solucao inicial
-        print(f"    Aplicando VND inicial...", flush=True)
+        logger.info("    Aplicando VND inicial...")
+        detalhar = logger.isEnabledFor(logging.DEBUG)
         x_ij, y_jk, h_ik, melhor_valor = self.busca_local.variable_neighborhood_descent(
-            x_ij, y_jk, h_ik, funcao_objetivo, verbose=True)
+            x_ij, y_jk, h_ik, funcao_objetivo, verbose=detalhar)
         
-        print(f"    Valor inicial (apos VND): {melhor_valor:.2f}", flush=True)
+        logger.info("    Valor inicial (apos VND): %.2f", melhor_valor)
+        violacao_atual, _ = self.funcoes_objetivo.avaliar_solucao_cache(x_ij, y_jk, h_ik, funcao_objetivo)
         
         historico = [melhor_valor]
         iteracoes_sem_melhoria = 0
@@ -53,18 +86,19 @@ class AlgoritmoVNS:
         for iteracao in range(max_iter):
             # Mostra progresso
             if iteracao % 10 == 0 or iteracao < 5:
-                print(f"    Iter {iteracao}/{max_iter} | Valor: {melhor_valor:.2f} | Sem melhoria: {iteracoes_sem_melhoria}", flush=True)
+                logger.info("    Iter %d/%d | Valor: %.2f | Sem melhoria: %d",
+                            iteracao, max_iter, melhor_valor, iteracoes_sem_melhoria)
             
             # Loop k: itera pelas estruturas de shake
             k = 1
-            verbose_vnd = (iteracao < 3)  # Mostra VND apenas nas primeiras 3 iterações
+            verbose_vnd = detalhar and (iteracao < 3)  # Mostra VND apenas nas primeiras 3 iterações
             
             while k <= k_max_shake:
                 # x' = Shake(x, k) - intensidade aumenta com k
                 intensidade_shake = 0.2 + (k / k_max_shake) * 0.6  # 0.2 a 0.8
                 
                 if verbose_vnd:
-                    print(f"      Shake k={k}, intensidade={intensidade_shake:.2f}", flush=True)
+                    logger.debug("      Shake k=%d, intensidade=%.2f", k, intensidade_shake)
                 
                 x_shake, y_shake, h_shake = self.busca_local.shake_adaptativo(
                     x_ij, y_jk, h_ik, intensidade_shake)
@@ -74,18 +108,18 @@ class AlgoritmoVNS:
                     x_shake, y_shake, h_shake, funcao_objetivo, verbose=verbose_vnd)
                 
                 # NeighborhoodChange: usa Tournament Selection para comparar
-                sol_atual = (x_ij, y_jk, h_ik)
-                sol_viz = (x_viz, y_viz, h_viz)
-                sol_escolhida, aceita = self.busca_local.tournament_selection(
-                    sol_atual, sol_viz, funcao_objetivo)
+                violacao_viz, _ = self.funcoes_objetivo.avaliar_solucao_cache(x_viz, y_viz, h_viz, funcao_objetivo)
+                aceita = self.busca_local.tournament_selection(
+                    melhor_valor, violacao_atual, valor_viz, violacao_viz)
                 
                 if aceita:
                     # Aceita nova solucao e reinicia k
-                    x_ij, y_jk, h_ik = sol_escolhida
-                    melhor_valor = valor_viz
+                    x_ij, y_jk, h_ik = x_viz, y_viz, h_viz
+                    melhor_valor, violacao_atual = valor_viz, violacao_viz
                     k = 1  # Reinicia
                     iteracoes_sem_melhoria = 0
-                    print(f"    >>> Melhoria! Novo valor: {valor_viz:.2f}", flush=True)
+                    if detalhar:
+                        logger.debug("    >>> Melhoria! Novo valor: %.2f", valor_viz)
                 else:
                     # Incrementa k para proxima vizinhanca
                     k += 1
@@ -98,14 +132,14 @@ class AlgoritmoVNS:
             
             # Criterio de parada inteligente: para cedo se muitas iteracoes sem melhoria
             if iteracoes_sem_melhoria >= max_iter_sem_melhoria:
-                print(f"    Parada antecipada: {iteracoes_sem_melhoria} iteracoes sem melhoria", flush=True)
+                logger.info("    Parada antecipada: %d iteracoes sem melhoria", iteracoes_sem_melhoria)
                 break
         
-        print(f"  GVNS concluido - Melhor valor: {melhor_valor:.2f}", flush=True)
+        logger.info("  GVNS concluido - Melhor valor: %.2f", melhor_valor)
         
         # Verifica quantas equipes estao sendo usadas
         equipes_usadas = np.sum(np.sum(h_ik, axis=0) > 0)
-        print(f"  Equipes utilizadas: {equipes_usadas}/{self.s_equipes}", flush=True)
+        logger.info("  Equipes utilizadas: %d/%d", equipes_usadas, self.s_equipes)
         
         return {
             'x_ij': x_ij,
@@ -116,28 +150,39 @@ class AlgoritmoVNS:
             'funcao_objetivo': funcao_objetivo
         }
     
-    def otimizacao_mono_objetivo(self, n_execucoes: int = 5) -> Dict:
+    def otimizacao_mono_objetivo(self, n_execucoes: int = 5, semente: Optional[int] = None) -> Dict:
         """
         Executa otimização mono-objetivo para f1 e f2.
         
         Args:
             n_execucoes: Número de execuções para cada função
+            semente: Semente da rodada (None = nova; a usada é impressa para poder repetir)
             
         Returns:
             Resultados das otimizações
         """
         resultados = {}
         
+        # Uma entropia por chamada; cada execução deriva dela a sua semente (reprodutível)
+        entropia = np.random.SeedSequence(semente).entropy
+        print(f"Semente: {entropia}")
+        
         for funcao in ['f1', 'f2']:
             print(f"\n{'='*50}")
             print(f"OTIMIZANDO {funcao.upper()}")
             print(f"{'='*50}")
             
-            execucoes = []
-            for execucao in range(n_execucoes):
+            # As execuções são independentes: roda todas em paralelo (um processo por execução,
+            # cada uma com o gerador aleatório derivado do seu índice)
+            n_workers = min(n_execucoes, os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     initializer=inicializar_worker,
+                                     initargs=(self.monitoramento.arquivo_dados,)) as executor:
+                execucoes = list(executor.map(_executar_vns, [funcao] * n_execucoes,
+                                               range(n_execucoes), [entropia] * n_execucoes))
+            
+            for execucao, resultado in enumerate(execucoes):
                 print(f"\nExecução {execucao + 1}/{n_execucoes} de {funcao.upper()}:")
-                resultado = self.vns(funcao, max_iter=500, max_iter_sem_melhoria=5)
-                execucoes.append(resultado)
                 print(f"  Resultado: {resultado['valor_objetivo']:.2f}")
             
             # Estatísticas
@@ -169,6 +214,8 @@ class AlgoritmoVNS:
             parametro: Dict com parâmetros do método:
                        Para 'pw': {'w1': float, 'w2': float, 'f1_min': float, 'f1_max': float, 
                                   'f2_min': float, 'f2_max': float}
+                                 (opcionalmente 'c1', 'c2' = w/(max - min) já calculados e
+                                  'pontos_conhecidos': array (n, 2) de (f1, f2) já obtidos)
                        Para 'pe': {'epsilon_2': float}
             max_iter: Número máximo de iterações
             max_iter_sem_melhoria: Critério de parada
@@ -177,9 +224,6 @@ class AlgoritmoVNS:
         Returns:
             Dicionário com resultados
         """
-        # Define seed aleatoria
-        np.random.seed(None)
-        
         # Solução inicial ADAPTATIVA para multiobjetivo
         if solucao_inicial is None:
             # Determina número de equipes baseado no modo e parâmetros
@@ -187,13 +231,13 @@ class AlgoritmoVNS:
                 # Weighted Sum: w2 alto -> poucas equipes, w1 alto -> mais equipes
                 w1, w2 = parametro['w1'], parametro['w2']
                 if w2 > 0.7:  # Prioriza f2 (poucas equipes)
-                    n_equipes_target = np.random.randint(1, max(2, self.s_equipes // 3))
+                    n_equipes_target = self.rng.integers(1, max(2, self.s_equipes // 3))
                     prioridade_f1 = False
                 elif w1 > 0.7:  # Prioriza f1 (mais equipes para minimizar distância)
-                    n_equipes_target = np.random.randint(self.s_equipes // 2, self.s_equipes + 1)
+                    n_equipes_target = self.rng.integers(self.s_equipes // 2, self.s_equipes + 1)
                     prioridade_f1 = True
                 else:  # Balanceado
-                    n_equipes_target = np.random.randint(2, self.s_equipes)
+                    n_equipes_target = self.rng.integers(2, self.s_equipes)
                     prioridade_f1 = (w1 > w2)
             else:  # pe (epsilon-constraint)
                 # Epsilon baixo -> poucas equipes, epsilon alto -> mais equipes permitidas
@@ -209,26 +253,52 @@ class AlgoritmoVNS:
         else:
             x_ij, y_jk, h_ik = solucao_inicial
         
+        # Coeficientes de f1 e f2 no valor minimizado (F_w em Pw, f1 em Pε): constantes
+        # durante toda a execução; também estimam a variação de um movimento sem chamar avaliar
+        if modo == 'pw':
+            if 'c1' in parametro:  # Já calculados por gerar_vetores_peso
+                coeficientes = (parametro['c1'], parametro['c2'])
+            else:
+                faixa_f1 = parametro['f1_max'] - parametro['f1_min']
+                faixa_f2 = parametro['f2_max'] - parametro['f2_min']
+                coeficientes = (parametro['w1'] / faixa_f1 if faixa_f1 > 1e-10 else 0.0,
+                                parametro['w2'] / faixa_f2 if faixa_f2 > 1e-10 else 0.0)
+        else:
+            coeficientes = (1.0, 0.0)
+        
         # Define função de avaliação baseada no modo
         if modo == 'pw':
             def avaliar(x, y, h):
                 return self.funcoes_objetivo.calcular_objetivo_pw(
                     x, y, h, parametro['w1'], parametro['w2'],
                     parametro['f1_min'], parametro['f1_max'],
-                    parametro['f2_min'], parametro['f2_max'])
+                    parametro['f2_min'], parametro['f2_max'],
+                    coeficientes=coeficientes)
         else:  # pe
             def avaliar(x, y, h):
                 return self.funcoes_objetivo.calcular_objetivo_pe(
                     x, y, h, parametro['epsilon_2'])
         
-        # Avalia solução inicial
-        resultado_inicial = avaliar(x_ij, y_jk, h_ik)
+        # Avalia solução inicial (resultado_atual acompanha sempre a solução corrente)
+        resultado_atual = avaliar(x_ij, y_jk, h_ik)
         if modo == 'pw':
-            melhor_escalar, f1_atual, f2_atual, feasible, violation = resultado_inicial
+            melhor_escalar, f1_atual, f2_atual, feasible, violation = resultado_atual
         else:
-            f1_atual, f2_atual, feasible, violation = resultado_inicial
+            f1_atual, f2_atual, feasible, violation = resultado_atual
             melhor_escalar = f1_atual  # Para Pε, minimizamos f1
         
+        # Pontos (f1, f2) já encontrados por outras execuções: se a solução corrente é
+        # dominada por algum deles, dificilmente vai gerar um ponto novo na fronteira
+        pontos_conhecidos = parametro.get('pontos_conhecidos') if parametro else None
+        
+        def dominada_por_conhecidos(f1, f2):
+            if pontos_conhecidos is None or len(pontos_conhecidos) == 0:
+                return False
+            f1_c, f2_c = pontos_conhecidos[:, 0], pontos_conhecidos[:, 1]
+            return bool(np.any((f1_c <= f1) & (f2_c <= f2) & ((f1_c < f1) | (f2_c < f2))))
+        
+        dominada = dominada_por_conhecidos(f1_atual, f2_atual)
+        
         historico_escalar = [melhor_escalar]
         historico_f1 = [f1_atual]
         historico_f2 = [f2_atual]
@@ -246,25 +316,23 @@ class AlgoritmoVNS:
                     x_ij, y_jk, h_ik, intensidade_shake)
                 
                 # Busca local usando a mesma função de avaliação
-                x_viz, y_viz, h_viz, valor_viz = self._busca_local_multiobj(
-                    x_shake, y_shake, h_shake, avaliar, modo)
+                x_viz, y_viz, h_viz, valor_viz, resultado_viz = self._busca_local_multiobj(
+                    x_shake, y_shake, h_shake, avaliar, coeficientes)
                 
-                # Compara usando tournament selection adaptado
+                # Compara usando tournament selection adaptado (com as avaliações já feitas)
                 sol_atual = (x_ij, y_jk, h_ik)
                 sol_viz = (x_viz, y_viz, h_viz)
                 sol_escolhida, aceita = self._tournament_selection_multiobj(
-                    sol_atual, sol_viz, avaliar, modo)
+                    sol_atual, resultado_atual, sol_viz, resultado_viz)
                 
                 if aceita:
                     x_ij, y_jk, h_ik = sol_escolhida
                     melhor_escalar = valor_viz
+                    resultado_atual = resultado_viz
                     
-                    # Atualiza f1 e f2
-                    resultado = avaliar(x_ij, y_jk, h_ik)
-                    if modo == 'pw':
-                        _, f1_atual, f2_atual, _, _ = resultado
-                    else:
-                        f1_atual, f2_atual, _, _ = resultado
+                    # Atualiza f1 e f2 (as duas avaliações terminam em f1, f2, feasible, violation)
+                    *_, f1_atual, f2_atual, _, _ = resultado_atual
+                    dominada = dominada_por_conhecidos(f1_atual, f2_atual)
                     
                     k = 1
                     iteracoes_sem_melhoria = 0
@@ -274,6 +342,10 @@ class AlgoritmoVNS:
             if k > k_max_shake:
                 iteracoes_sem_melhoria += 1
             
+            # Solução já dominada por um ponto conhecido: acelera a parada
+            if dominada:
+                iteracoes_sem_melhoria += 2
+            
             historico_escalar.append(melhor_escalar)
             historico_f1.append(f1_atual)
             historico_f2.append(f2_atual)
@@ -281,8 +353,8 @@ class AlgoritmoVNS:
             if iteracoes_sem_melhoria >= max_iter_sem_melhoria:
                 break
         
-        # Calcula valores finais
-        resultado_final = avaliar(x_ij, y_jk, h_ik)
+        # Valores finais (já avaliados junto com a solução corrente)
+        resultado_final = resultado_atual
         if modo == 'pw':
             escalar_final, f1_final, f2_final, feasible_final, violation_final = resultado_final
         else:
@@ -306,120 +378,181 @@ class AlgoritmoVNS:
         }
     
     def _busca_local_multiobj(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
-                             avaliar: Callable, modo: str) -> Tuple:
+                             avaliar: Callable, coeficientes: Tuple[float, float]) -> Tuple:
         """
         Busca local para multi-objetivo.
         Aplica shift de ativos e consolidação de equipes.
+        
+        Não depende do modo: avaliar retorna (F_w, f1, f2, feasible, violation) em Pw e
+        (f1, f2, feasible, violation) em Pε, ou seja, o valor minimizado vem sempre
+        primeiro e (feasible, violation) sempre no fim.
+        
+        Args:
+            coeficientes: (c1, c2) tais que o valor minimizado varia c1*Δf1 + c2*Δf2
+        
+        Returns:
+            (x_ij, y_jk, h_ik, valor, resultado), onde resultado é a tupla
+            completa de avaliar() para a solução retornada
         """
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        resultado = avaliar(melhor_x, melhor_y, melhor_h)
-        if modo == 'pw':
-            melhor_valor = resultado[0]  # F_w
-        else:
-            melhor_valor = resultado[0]  # f1
+        # Primeiro elemento é o valor minimizado: F_w em Pw, f1 em Pε
+        melhor_resultado = avaliar(melhor_x, melhor_y, melhor_h)
+        
+        # Equipe de cada ativo (-1 se estiver sem equipe); h_ik tem no máximo um 1 por linha.
+        # Os kernels atualizam o vetor a cada movimento aceito, junto com melhor_h
+        equipe_do_ativo = np.where(melhor_h.any(axis=1), melhor_h.argmax(axis=1), -1)
         
         # Aplica iterações de busca local
         for iteracao in range(5):
-            melhorou = False
-            
             # FASE 1: Shift de ativos entre equipes (melhora f1)
-            for i in range(min(self.n_ativos, 40)):
-                idx_ativo = np.random.randint(0, self.n_ativos)
-                equipe_atual = np.where(melhor_h[idx_ativo, :] == 1)[0]
-                if len(equipe_atual) == 0:
-                    continue
-                equipe_atual = equipe_atual[0]
-                
-                base_ativo = np.where(melhor_x[idx_ativo, :] == 1)[0][0]
-                equipes_base = np.where(melhor_y[base_ativo, :] == 1)[0]
-                
-                for k in equipes_base:
-                    if k != equipe_atual:
-                        h_novo = melhor_h.copy()
-                        h_novo[idx_ativo, equipe_atual] = 0
-                        h_novo[idx_ativo, k] = 1
-                        
-                        resultado_novo = avaliar(melhor_x, melhor_y, h_novo)
-                        if modo == 'pw':
-                            valor_novo, _, _, feasible, violation = resultado_novo
-                        else:
-                            valor_novo, _, feasible, violation = resultado_novo
-                        
-                        if feasible or violation < 0.1:
-                            if valor_novo < melhor_valor:
-                                melhor_h = h_novo.copy()
-                                melhor_valor = valor_novo
-                                melhorou = True
-                                break
-                
-                if melhorou:
-                    break
+            melhor_h, melhor_resultado, melhorou = self._shift_ativo_kernel(
+                melhor_x, melhor_y, melhor_h, equipe_do_ativo, melhor_resultado, avaliar, coeficientes)
             
             # FASE 2: Consolidação de equipes (melhora f2)
-            # Remove equipes com poucos ativos consolidando-as em outras
             if iteracao % 2 == 0:  # Aplica a cada 2 iterações
-                ativos_por_equipe = np.sum(melhor_h, axis=0)
-                equipes_ativas = np.where(ativos_por_equipe > 0)[0]
-                
-                if len(equipes_ativas) > 1:
-                    # Escolhe equipe com menos ativos
-                    equipe_pequena = equipes_ativas[np.argmin(ativos_por_equipe[equipes_ativas])]
-                    base_equipe_pequena = np.where(melhor_y[:, equipe_pequena] == 1)[0][0]
-                    ativos_equipe_pequena = np.where(melhor_h[:, equipe_pequena] == 1)[0]
-                    
-                    # Tenta consolidar na mesma base primeiro
-                    outras_equipes_mesma_base = np.where(melhor_y[base_equipe_pequena, :] == 1)[0]
-                    outras_equipes_mesma_base = outras_equipes_mesma_base[outras_equipes_mesma_base != equipe_pequena]
-                    
-                    for equipe_destino in outras_equipes_mesma_base:
-                        h_novo = melhor_h.copy()
-                        y_novo = melhor_y.copy()
-                        
-                        # Move todos os ativos
-                        for ativo in ativos_equipe_pequena:
-                            h_novo[ativo, equipe_pequena] = 0
-                            h_novo[ativo, equipe_destino] = 1
-                        
-                        # Remove equipe pequena
-                        y_novo[base_equipe_pequena, equipe_pequena] = 0
-                        
-                        resultado_novo = avaliar(melhor_x, y_novo, h_novo)
-                        if modo == 'pw':
-                            valor_novo, _, _, feasible, violation = resultado_novo
-                        else:
-                            valor_novo, _, feasible, violation = resultado_novo
-                        
-                        if feasible or violation < 0.1:
-                            if valor_novo < melhor_valor:
-                                melhor_y = y_novo.copy()
-                                melhor_h = h_novo.copy()
-                                melhor_valor = valor_novo
-                                melhorou = True
-                                break
+                melhor_y, melhor_h, melhor_resultado, consolidou = self._consolida_equipe_kernel(
+                    melhor_x, melhor_y, melhor_h, equipe_do_ativo, melhor_resultado, avaliar)
+                melhorou = melhorou or consolidou
             
             if not melhorou:
                 break
         
-        return melhor_x, melhor_y, melhor_h, melhor_valor
+        return melhor_x, melhor_y, melhor_h, melhor_resultado[0], melhor_resultado
     
-    def _tournament_selection_multiobj(self, x: Tuple, y: Tuple, avaliar: Callable, modo: str) -> Tuple[Tuple, bool]:
+    def _contar_ativos_por_equipe(self, equipe_do_ativo: np.ndarray) -> np.ndarray:
+        """Número de ativos de cada equipe a partir do vetor de atribuição (bincount)."""
+        return np.bincount(equipe_do_ativo[equipe_do_ativo >= 0], minlength=self.s_equipes)
+    
+    def _shift_ativo_kernel(self, melhor_x: np.ndarray, melhor_y: np.ndarray, melhor_h: np.ndarray,
+                            equipe_do_ativo: np.ndarray, melhor_resultado: Tuple, avaliar: Callable,
+                            coeficientes: Tuple[float, float]) -> Tuple:
         """
-        Tournament selection para comparação de soluções no contexto multi-objetivo.
+        Fase 1 da busca local multiobjetivo: move um ativo sorteado para outra
+        equipe da mesma base (primeira melhora). Altera melhor_h e equipe_do_ativo no lugar.
+        
+        A variação de f1 e f2 de todas as equipes candidatas é calculada de uma
+        vez; avaliar só é chamado para os movimentos que melhoram o valor,
+        para confirmar a viabilidade.
+        
+        Returns:
+            (melhor_h, melhor_resultado, melhorou)
+        """
+        melhor_valor = melhor_resultado[0]
+        coef_f1, coef_f2 = coeficientes
+        
+        # melhor_y não muda nesta fase e melhor_h só muda quando o movimento é aceito (retorno),
+        # então os índices de atribuição são calculados uma vez só
+        base_da_equipe = melhor_y.argmax(axis=0)
+        tem_base = melhor_y.any(axis=0)
+        ativos_por_equipe = self._contar_ativos_por_equipe(equipe_do_ativo)
+        base_do_ativo = melhor_x.argmax(axis=1)
+        equipes_da_base = [np.flatnonzero(linha) for linha in melhor_y]
+        
+        # Sorteia de uma vez os ativos testados nesta chamada
+        for idx_ativo in self.rng.integers(0, self.n_ativos, size=min(self.n_ativos, 40)):
+            equipe_atual = equipe_do_ativo[idx_ativo]
+            if equipe_atual < 0:
+                continue
+            equipes_base = equipes_da_base[base_do_ativo[idx_ativo]]
+            
+            candidatas = equipes_base[equipes_base != equipe_atual]
+            if len(candidatas) == 0:
+                continue
+            
+            # Distância do ativo até a base de cada equipe (equipe sem base não entra em f1)
+            dist_ativo = np.where(tem_base, self.distancias[idx_ativo, base_da_equipe], 0.0)
+            delta_f1 = dist_ativo[candidatas] - dist_ativo[equipe_atual]
+            # f2 cai se a equipe atual esvazia e sobe se a equipe destino estava vazia
+            delta_f2 = (ativos_por_equipe[candidatas] == 0).astype(float) - float(ativos_por_equipe[equipe_atual] == 1)
+            delta = coef_f1 * delta_f1 + coef_f2 * delta_f2
+            
+            # Só os movimentos que melhoram o valor, do maior ganho para o menor
+            for pos in np.argsort(delta, kind='stable'):
+                if delta[pos] >= 0:
+                    break
+                k = candidatas[pos]
+                
+                # Aplica o movimento no próprio melhor_h e desfaz se for rejeitado
+                melhor_h[idx_ativo, equipe_atual] = 0
+                melhor_h[idx_ativo, k] = 1
+                
+                resultado_novo = avaliar(melhor_x, melhor_y, melhor_h)
+                valor_novo, *_, feasible, violation = resultado_novo
+                
+                if (feasible or violation < 0.1) and valor_novo < melhor_valor:
+                    equipe_do_ativo[idx_ativo] = k
+                    return melhor_h, resultado_novo, True
+                
+                melhor_h[idx_ativo, k] = 0
+                melhor_h[idx_ativo, equipe_atual] = 1
+        
+        return melhor_h, melhor_resultado, False
+    
+    def _consolida_equipe_kernel(self, melhor_x: np.ndarray, melhor_y: np.ndarray, melhor_h: np.ndarray,
+                                 equipe_do_ativo: np.ndarray, melhor_resultado: Tuple, avaliar: Callable) -> Tuple:
         """
-        x_ij, y_jk, h_ik = x
-        y_x_ij, y_y_jk, y_h_ik = y
+        Fase 2 da busca local multiobjetivo: remove a equipe com menos ativos,
+        movendo todos os seus ativos para outra equipe da mesma base.
+        Altera melhor_y, melhor_h e equipe_do_ativo no lugar.
         
-        # Avalia ambas as soluções
-        resultado_x = avaliar(x_ij, y_jk, h_ik)
-        resultado_y = avaliar(y_x_ij, y_y_jk, y_h_ik)
+        Returns:
+            (melhor_y, melhor_h, melhor_resultado, melhorou)
+        """
+        melhor_valor = melhor_resultado[0]
+        ativos_por_equipe = self._contar_ativos_por_equipe(equipe_do_ativo)
+        equipes_ativas = np.flatnonzero(ativos_por_equipe)
+        
+        if len(equipes_ativas) <= 1:
+            return melhor_y, melhor_h, melhor_resultado, False
+        
+        # Escolhe equipe com menos ativos
+        equipe_pequena = equipes_ativas[np.argmin(ativos_por_equipe[equipes_ativas])]
+        if not melhor_y[:, equipe_pequena].any():
+            return melhor_y, melhor_h, melhor_resultado, False  # Equipe sem base: não há onde consolidar
+        base_equipe_pequena = melhor_y[:, equipe_pequena].argmax()
+        ativos_equipe_pequena = np.flatnonzero(equipe_do_ativo == equipe_pequena)
+        
+        # Tenta consolidar na mesma base primeiro
+        outras_equipes_mesma_base = np.flatnonzero(melhor_y[base_equipe_pequena, :])
+        outras_equipes_mesma_base = outras_equipes_mesma_base[outras_equipes_mesma_base != equipe_pequena]
+        
+        for equipe_destino in outras_equipes_mesma_base:
+            # Guarda só o trecho da coluna destino que será sobrescrito (para desfazer)
+            destino_antes = melhor_h[ativos_equipe_pequena, equipe_destino].copy()
+            
+            # Move todos os ativos de uma vez
+            melhor_h[ativos_equipe_pequena, equipe_pequena] = 0
+            melhor_h[ativos_equipe_pequena, equipe_destino] = 1
+            
+            # Remove equipe pequena
+            melhor_y[base_equipe_pequena, equipe_pequena] = 0
+            
+            resultado_novo = avaliar(melhor_x, melhor_y, melhor_h)
+            valor_novo, *_, feasible, violation = resultado_novo
+            
+            if (feasible or violation < 0.1) and valor_novo < melhor_valor:
+                equipe_do_ativo[ativos_equipe_pequena] = equipe_destino
+                return melhor_y, melhor_h, resultado_novo, True
+            
+            # Desfaz o movimento
+            melhor_y[base_equipe_pequena, equipe_pequena] = 1
+            melhor_h[ativos_equipe_pequena, equipe_destino] = destino_antes
+            melhor_h[ativos_equipe_pequena, equipe_pequena] = 1
         
-        if modo == 'pw':
-            fx, _, _, _, vx = resultado_x
-            fy, _, _, _, vy = resultado_y
-        else:
-            fx, _, _, vx = resultado_x
-            fy, _, _, vy = resultado_y
+        return melhor_y, melhor_h, melhor_resultado, False
+    
+    def _tournament_selection_multiobj(self, x: Tuple, resultado_x: Tuple,
+                                       y: Tuple, resultado_y: Tuple) -> Tuple[Tuple, bool]:
+        """
+        Tournament selection para comparação de soluções no contexto multi-objetivo.
+        
+        Args:
+            x, y: Soluções (x_ij, y_jk, h_ik) comparadas
+            resultado_x, resultado_y: Avaliações já calculadas de x e y (saída de avaliar)
+        """
+        fx, vx = resultado_x[0], resultado_x[-1]
+        fy, vy = resultado_y[0], resultado_y[-1]
         
         # Tournament Selection
         # 1. Se ambas viáveis, escolhe a de melhor objetivo escalar
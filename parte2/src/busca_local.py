@@ -1,10 +1,18 @@
+import logging
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 class BuscaLocal:
     # Classe que implementa as estruturas de vizinhanca e busca local para melhorar solucoes
+    #
+    # Convenção de layout: x_ij, y_jk e h_ik são uint8 em ordem C (padrão do numpy). As
+    # vizinhanças trabalham sobre os vetores de _pack/_estado_delta e acessam as matrizes
+    # por linhas (x_ij[ativos], h_ik[ativos], y_jk[bases]) ou por reduções inteiras, então
+    # não há ganho em guardá-las em ordem Fortran (medido: diferença dentro do ruído).
     
-    def __init__(self, monitoramento):
+    def __init__(self, monitoramento, seed: Optional[int] = None):
         # Pega os dados do problema da classe principal
         self.monitoramento = monitoramento
         self.n_ativos = monitoramento.n_ativos
@@ -13,265 +21,426 @@ class BuscaLocal:
         self.eta = monitoramento.eta
         self.distancias = monitoramento.distancias
         self.funcoes_objetivo = monitoramento.funcoes_objetivo
+        
+        # Mínimo de ativos por equipe usada (restrição 6)
+        self.minimo_ativos = self.eta * self.n_ativos / self.s_equipes
+        
+        # Bases ordenadas da mais próxima para a mais distante de cada ativo (distancias não muda)
+        self._base_order = np.argsort(self.distancias, axis=1, kind='stable').astype(np.int32)
+        
+        # Gerador aleatório usado no shake (o AlgoritmoVNS substitui pelo seu, ver algoritmos_vns)
+        self.rng = np.random.default_rng(seed)
     
-    def tournament_selection(self, x: Tuple, y: Tuple, funcao_objetivo: str) -> Tuple[Tuple, bool]:
+    def _pack(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Tournament Selection para comparar duas soluções usando constraint handling.
+        Converte as matrizes one-hot em vetores de atribuição usados pelas vizinhanças.
         
         Args:
-            x: Tupla (x_ij, y_jk, h_ik) da solução atual
-            y: Tupla (x_ij, y_jk, h_ik) da solução candidata
-            funcao_objetivo: 'f1' ou 'f2'
+            x_ij, y_jk, h_ik: Solução no formato de matrizes binárias
             
         Returns:
-            Tupla com (solução escolhida, True se y foi aceita)
+            (base_do_ativo, equipe_do_ativo, base_da_equipe, ativos_por_equipe), com -1
+            para ativo sem base/equipe e para equipe sem base
+        """
+        base_do_ativo = np.where(x_ij.any(axis=1), x_ij.argmax(axis=1), -1)
+        equipe_do_ativo = np.where(h_ik.any(axis=1), h_ik.argmax(axis=1), -1)
+        base_da_equipe = np.where(y_jk.any(axis=0), y_jk.argmax(axis=0), -1)
+        ativos_por_equipe = h_ik.sum(axis=0, dtype=np.int64)
+        return base_do_ativo, equipe_do_ativo, base_da_equipe, ativos_por_equipe
+    
+    def _equipe_violada(self, soma_equipe, carga):
+        """Indica se a equipe viola as restrições 1 ou 6, dada sua soma em y_jk e seu número de ativos."""
+        return ((soma_equipe > 1) | ((carga > 0) & (soma_equipe != 1)) |
+                ((soma_equipe == 1) & (carga == 0)) | ((carga > 0) & (carga < self.minimo_ativos)))
+    
+    def _estado_delta(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray) -> dict:
         """
-        x_ij, y_jk, h_ik = x
-        y_x_ij, y_y_jk, y_h_ik = y
+        Estado para avaliar os movimentos SHIFT, TASK MOVE e SWAP por diferença (delta).
         
-        # Calcula valores objetivo
-        if funcao_objetivo == 'f1':
-            fx = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
-            fy = self.funcoes_objetivo.calcular_f1(y_x_ij, y_h_ik, y_y_jk)
-        else:
-            fx = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
-            fy = self.funcoes_objetivo.calcular_f2(y_h_ik, y_y_jk)
+        Em vez do valor da violação, guarda quais ativos e quais equipes violam alguma
+        restrição: a vizinha é viável quando essa contagem chega a zero. Esses movimentos
+        não mexem em y_jk e levam o ativo para a base da sua nova equipe, então só mudam
+        os termos do próprio ativo e das equipes de origem e destino.
+        
+        Args:
+            x_ij, y_jk, h_ik: Solução atual (linhas de x_ij e h_ik com um único 1)
+            
+        Returns:
+            Dicionário com os vetores de _pack, as marcações de violação por ativo e
+            por equipe e a distância de cada ativo até a base de cada equipe
+        """
+        base_do_ativo, equipe_do_ativo, base_da_equipe, ativos_por_equipe = self._pack(x_ij, y_jk, h_ik)
+        soma_equipe = y_jk.sum(axis=0, dtype=np.int64)
+        equipes_por_base = y_jk.sum(axis=1, dtype=np.int64)
+        
+        # Restrições 2 e 4 (linhas de x_ij e h_ik), 3 (base sem equipe) e 5 (equipe fora da base do ativo)
+        linha_invalida = (x_ij.sum(axis=1) != 1) | (h_ik.sum(axis=1) != 1)
+        base_sem_equipe = (x_ij.astype(bool) & (equipes_por_base == 0)).any(axis=1)
+        equipe_fora_da_base = (h_ik.astype(bool) & (y_jk[base_do_ativo] != 1)).any(axis=1) & (base_do_ativo >= 0)
+        ativo_violado = linha_invalida | base_sem_equipe | equipe_fora_da_base
+        
+        equipe_violada = self._equipe_violada(soma_equipe, ativos_por_equipe)
+        
+        return {
+            'base_do_ativo': base_do_ativo,
+            'equipe_do_ativo': equipe_do_ativo,
+            'base_da_equipe': base_da_equipe,
+            'ativos_por_equipe': ativos_por_equipe,
+            'soma_equipe': soma_equipe,
+            'linha_invalida': linha_invalida,
+            'ativo_violado': ativo_violado,
+            'equipe_violada': equipe_violada,
+            'n_violados': int(ativo_violado.sum() + equipe_violada.sum()),
+            # Contribuição em f1 de um ativo atendido pela equipe k (0 se a equipe não tem base)
+            'dist_equipe': np.where(base_da_equipe >= 0, self.distancias[:, base_da_equipe], 0.0),
+        }
+    
+    def _avaliar_delta(self, estado: dict, ativos: np.ndarray, antigas: np.ndarray,
+                       novas: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Avalia de uma vez um lote de vizinhas obtidas movendo ativos entre equipes,
+        sem montar as matrizes novas.
+        
+        Cada linha é um candidato com M movimentos (1 no SHIFT e no TASK MOVE, 2 no SWAP):
+        o ativo ativos[c, m] sai da equipe antigas[c, m] e vai para a base da equipe novas[c, m].
+        
+        Args:
+            estado: Saída de _estado_delta para a solução atual
+            ativos, antigas, novas: Arrays inteiros (C x M)
+            
+        Returns:
+            (viavel, delta_f1, delta_f2), arrays de tamanho C
+        """
+        carga = estado['ativos_por_equipe']
+        
+        # Na base da equipe nova o ativo só viola algo se a linha já era inválida
+        delta_violados = (estado['linha_invalida'][ativos].astype(np.int64)
+                          - estado['ativo_violado'][ativos]).sum(axis=1)
+        delta_f1 = (estado['dist_equipe'][ativos, novas] - estado['dist_equipe'][ativos, antigas]).sum(axis=1)
+        
+        # Variação líquida de carga de cada equipe envolvida (a mesma equipe pode aparecer
+        # em mais de uma posição); cada equipe é contada só na sua primeira posição
+        equipes = np.concatenate([antigas, novas], axis=1)
+        sinais = np.concatenate([-np.ones(antigas.shape[1], dtype=np.int64), np.ones(novas.shape[1], dtype=np.int64)])
+        iguais = equipes[:, :, None] == equipes[:, None, :]
+        variacao = (iguais * sinais).sum(axis=2)
+        primeira = ~np.tril(iguais, k=-1).any(axis=2)
+        conta = primeira & (variacao != 0)
+        
+        carga_antes = carga[equipes]
+        carga_depois = carga_antes + variacao
+        violada_depois = self._equipe_violada(estado['soma_equipe'][equipes], carga_depois)
+        delta_violados += np.where(conta, violada_depois.astype(np.int64) - estado['equipe_violada'][equipes], 0).sum(axis=1)
+        delta_f2 = np.where(conta, (carga_depois > 0).astype(np.int64) - (carga_antes > 0), 0).sum(axis=1)
+        
+        return estado['n_violados'] + delta_violados == 0, delta_f1, delta_f2.astype(float)
+    
+    def _escolher_melhor(self, viavel: np.ndarray, valores: np.ndarray, melhor_valor: float,
+                         estrategia: str = 'best') -> int:
+        """
+        Escolhe o candidato que melhora melhor_valor (-1 se nenhum).
+        
+        Com estrategia='best' é o primeiro viável de menor valor (best improvement);
+        com 'first' é o primeiro viável que melhora, na ordem dos candidatos (first improvement).
+        """
+        melhora = viavel & (valores < melhor_valor)
+        if not melhora.any():
+            return -1
+        if estrategia == 'first':
+            return int(melhora.argmax())
+        return int(np.argmin(np.where(melhora, valores, np.inf)))
+    
+    def tournament_selection(self, fx: float, vx: float, fy: float, vy: float) -> bool:
+        """
+        Tournament Selection para comparar duas soluções usando constraint handling.
         
-        # Calcula violações
-        vx = self.funcoes_objetivo.calcular_violacao(x_ij, y_jk, h_ik)
-        vy = self.funcoes_objetivo.calcular_violacao(y_x_ij, y_y_jk, y_h_ik)
+        Recebe o valor objetivo e a violação já calculados pelo chamador, que
+        os mantém junto com a solução atual.
         
+        Args:
+            fx, vx: Valor objetivo e violação da solução atual
+            fy, vy: Valor objetivo e violação da solução candidata
+            
+        Returns:
+            True se a solução candidata deve ser aceita
+        """
         # Tournament Selection
         # 1. Se ambas viáveis, escolhe a de melhor objetivo
         if vx == 0.0 and vy == 0.0:
-            if fy < fx:
-                return y, True
-            else:
-                return x, False
+            return fy < fx
         
         # 2. Se y viável e x não, sempre aceita y
         if vy == 0.0 and vx > 0.0:
-            return y, True
+            return True
         
         # 3. Se x viável e y não, sempre rejeita y
         if vx == 0.0 and vy > 0.0:
-            return x, False
+            return False
         
         # 4. Se ambas inviáveis, escolhe a de menor violação
-        if vy < vx:
-            return y, True
-        else:
-            return x, False
+        return vy < vx
     
     def shift_ativo_equipe(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray, 
-                          funcao_objetivo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
-        """SHIFT: Move um ativo para outra equipe da mesma base (best improvement)."""
+                          funcao_objetivo: str, valor_inicial: Optional[float] = None,
+                          estrategia: str = 'best') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
+        """SHIFT: Move um ativo para outra equipe da mesma base (best ou first improvement)."""
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        if funcao_objetivo == 'f1':
+        # valor_inicial: valor objetivo de (x_ij, y_jk, h_ik) já conhecido pelo chamador
+        if valor_inicial is not None:
+            melhor_valor = valor_inicial
+        elif funcao_objetivo == 'f1':
             melhor_valor = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
         else:
             melhor_valor = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
         
-        melhorou = False
+        estado = self._estado_delta(x_ij, y_jk, h_ik)
+        base_do_ativo, equipe_do_ativo = estado['base_do_ativo'], estado['equipe_do_ativo']
         
-        for i in range(self.n_ativos):
-            equipe_atual = np.where(h_ik[i, :] == 1)[0][0]
-            base_ativo = np.where(x_ij[i, :] == 1)[0][0]
-            
-            # Tenta mover para outras equipes da mesma base
-            equipes_base = np.where(y_jk[base_ativo, :] == 1)[0]
-            
-            for k in equipes_base:
-                if k != equipe_atual:
-                    h_novo = h_ik.copy()
-                    h_novo[i, equipe_atual] = 0
-                    h_novo[i, k] = 1
-                    
-                    if self.funcoes_objetivo.verificar_restricoes(x_ij, y_jk, h_novo):
-                        if funcao_objetivo == 'f1':
-                            valor = self.funcoes_objetivo.calcular_f1(x_ij, h_novo, y_jk)
-                        else:
-                            valor = self.funcoes_objetivo.calcular_f2(h_novo, y_jk)
-                        
-                        if valor < melhor_valor:
-                            melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_novo.copy()
-                            melhor_valor = valor
-                            melhorou = True
+        # Todos os pares (ativo, outra equipe da mesma base), na ordem ativo -> equipe
+        candidatos = ((estado['base_da_equipe'][None, :] == base_do_ativo[:, None])
+                      & (np.arange(self.s_equipes)[None, :] != equipe_do_ativo[:, None])
+                      & (base_do_ativo >= 0)[:, None] & (equipe_do_ativo >= 0)[:, None])
+        ativos, equipes_novas = np.nonzero(candidatos)
         
-        return melhor_x, melhor_y, melhor_h, melhor_valor, melhorou
+        viavel, delta_f1, delta_f2 = self._avaliar_delta(
+            estado, ativos[:, None], equipe_do_ativo[ativos][:, None], equipes_novas[:, None])
+        valores = melhor_valor + (delta_f1 if funcao_objetivo == 'f1' else delta_f2)
+        
+        melhor = self._escolher_melhor(viavel, valores, melhor_valor, estrategia)
+        if melhor < 0:
+            return melhor_x, melhor_y, melhor_h, melhor_valor, False
+        
+        i, k = ativos[melhor], equipes_novas[melhor]
+        melhor_h[i, equipe_do_ativo[i]] = 0
+        melhor_h[i, k] = 1
+        
+        return melhor_x, melhor_y, melhor_h, valores[melhor], True
     
     
     def task_move(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
-                 funcao_objetivo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
-        """TASK MOVE: Move ativo para base mais proxima com equipe (best improvement)."""
+                 funcao_objetivo: str, valor_inicial: Optional[float] = None,
+                 estrategia: str = 'best') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
+        """TASK MOVE: Move ativo para base mais proxima com equipe (best ou first improvement)."""
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        if funcao_objetivo == 'f1':
+        if valor_inicial is not None:
+            melhor_valor = valor_inicial
+        elif funcao_objetivo == 'f1':
             melhor_valor = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
         else:
             melhor_valor = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
         
-        melhorou = False
-        
-        # Para cada ativo, tenta mover para as 3 bases mais proximas
-        for i in range(self.n_ativos):
-            base_atual = np.where(x_ij[i, :] == 1)[0][0]
-            
-            # Bases com equipes ordenadas por distancia
-            bases_com_equipes = np.where(np.sum(y_jk, axis=1) > 0)[0]
-            if len(bases_com_equipes) > 1:
-                distancias_bases = self.distancias[i, bases_com_equipes]
-                indices_ordenados = np.argsort(distancias_bases)
-                bases_proximas = bases_com_equipes[indices_ordenados[:min(3, len(bases_com_equipes))]]
-                
-                for j in bases_proximas:
-                    if j != base_atual:
-                        x_novo = x_ij.copy()
-                        h_novo = h_ik.copy()
-                        
-                        # Move ativo para nova base
-                        x_novo[i, base_atual] = 0
-                        x_novo[i, j] = 1
-                        
-                        # Atualiza equipe
-                        equipe_antiga = np.where(h_ik[i, :] == 1)[0][0]
-                        h_novo[i, equipe_antiga] = 0
-                        
-                        # Escolhe equipe da nova base com menos ativos
-                        equipes_nova_base = np.where(y_jk[j, :] == 1)[0]
-                        if len(equipes_nova_base) > 0:
-                            # Conta ativos por equipe
-                            ativos_por_equipe = np.sum(h_ik, axis=0)
-                            equipe_menos_carregada = equipes_nova_base[np.argmin(ativos_por_equipe[equipes_nova_base])]
-                            h_novo[i, equipe_menos_carregada] = 1
-                            
-                            if self.funcoes_objetivo.verificar_restricoes(x_novo, y_jk, h_novo):
-                                if funcao_objetivo == 'f1':
-                                    valor = self.funcoes_objetivo.calcular_f1(x_novo, h_novo, y_jk)
-                                else:
-                                    valor = self.funcoes_objetivo.calcular_f2(h_novo, y_jk)
-                                
-                                if valor < melhor_valor:
-                                    melhor_x, melhor_y, melhor_h = x_novo.copy(), y_jk.copy(), h_novo.copy()
-                                    melhor_valor = valor
-                                    melhorou = True
-        
-        return melhor_x, melhor_y, melhor_h, melhor_valor, melhorou
+        # Bases com equipes
+        base_tem_equipe = np.sum(y_jk, axis=1) > 0
+        bases_com_equipes = np.flatnonzero(base_tem_equipe)
+        if len(bases_com_equipes) <= 1:
+            return melhor_x, melhor_y, melhor_h, melhor_valor, False
+        
+        estado = self._estado_delta(x_ij, y_jk, h_ik)
+        base_do_ativo, equipe_do_ativo = estado['base_do_ativo'], estado['equipe_do_ativo']
+        base_da_equipe, ativos_por_equipe = estado['base_da_equipe'], estado['ativos_por_equipe']
+        
+        # Para cada ativo, as 3 bases com equipe mais proximas: as primeiras de _base_order
+        # que têm equipe, na ordem em que aparecem
+        n_proximas = min(3, len(bases_com_equipes))
+        tem_equipe_ordenada = base_tem_equipe[self._base_order]
+        selecionadas = tem_equipe_ordenada & (np.cumsum(tem_equipe_ordenada, axis=1) <= n_proximas)
+        bases_proximas = self._base_order[selecionadas].reshape(self.n_ativos, n_proximas)
+        
+        # Equipe com menos ativos de cada base (a carga não muda durante a varredura)
+        na_base = base_da_equipe[None, :] == np.arange(self.m_bases)[:, None]
+        equipe_menos_carregada = np.where(na_base, ativos_por_equipe[None, :], np.iinfo(np.int64).max).argmin(axis=1)
+        tem_equipe = na_base.any(axis=1)
+        
+        ativos = np.repeat(np.arange(self.n_ativos), bases_proximas.shape[1])
+        bases_novas = bases_proximas.ravel()
+        validos = ((bases_novas != base_do_ativo[ativos]) & tem_equipe[bases_novas]
+                   & (base_do_ativo[ativos] >= 0) & (equipe_do_ativo[ativos] >= 0))
+        ativos, bases_novas = ativos[validos], bases_novas[validos]
+        equipes_novas = equipe_menos_carregada[bases_novas]
+        
+        viavel, delta_f1, delta_f2 = self._avaliar_delta(
+            estado, ativos[:, None], equipe_do_ativo[ativos][:, None], equipes_novas[:, None])
+        valores = melhor_valor + (delta_f1 if funcao_objetivo == 'f1' else delta_f2)
+        
+        melhor = self._escolher_melhor(viavel, valores, melhor_valor, estrategia)
+        if melhor < 0:
+            return melhor_x, melhor_y, melhor_h, melhor_valor, False
+        
+        # Move ativo para nova base e para a equipe escolhida
+        i, j, k = ativos[melhor], bases_novas[melhor], equipes_novas[melhor]
+        melhor_x[i, base_do_ativo[i]] = 0
+        melhor_x[i, j] = 1
+        melhor_h[i, equipe_do_ativo[i]] = 0
+        melhor_h[i, k] = 1
+        
+        return melhor_x, melhor_y, melhor_h, valores[melhor], True
     
     def swap_ativos_bases(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
-                         funcao_objetivo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
-        """SWAP: Troca ativos entre duas bases diferentes (best improvement)."""
+                         funcao_objetivo: str, valor_inicial: Optional[float] = None,
+                         estrategia: str = 'best') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
+        """SWAP: Troca ativos entre duas bases diferentes (best ou first improvement)."""
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        if funcao_objetivo == 'f1':
+        if valor_inicial is not None:
+            melhor_valor = valor_inicial
+        elif funcao_objetivo == 'f1':
             melhor_valor = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
         else:
             melhor_valor = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
         
-        melhorou = False
-        
-        # Testa trocar ativos entre bases diferentes
-        ativos_sample = np.random.choice(self.n_ativos, min(20, self.n_ativos), replace=False)
-        
-        for i in ativos_sample:
-            base_i = np.where(x_ij[i, :] == 1)[0][0]
-            equipe_i = np.where(h_ik[i, :] == 1)[0][0]
-            
-            for j in range(i+1, self.n_ativos):
-                base_j = np.where(x_ij[j, :] == 1)[0][0]
-                equipe_j = np.where(h_ik[j, :] == 1)[0][0]
-                
-                if base_i != base_j:
-                    x_novo = x_ij.copy()
-                    h_novo = h_ik.copy()
-                    
-                    # Troca as bases dos ativos
-                    x_novo[i, base_i] = 0
-                    x_novo[i, base_j] = 1
-                    x_novo[j, base_j] = 0
-                    x_novo[j, base_i] = 1
-                    
-                    # Atualiza equipes
-                    h_novo[i, equipe_i] = 0
-                    h_novo[j, equipe_j] = 0
-                    
-                    # Atribui a equipes das novas bases
-                    equipes_base_j = np.where(y_jk[base_j, :] == 1)[0]
-                    equipes_base_i = np.where(y_jk[base_i, :] == 1)[0]
-                    
-                    if len(equipes_base_j) > 0 and len(equipes_base_i) > 0:
-                        h_novo[i, equipes_base_j[0]] = 1
-                        h_novo[j, equipes_base_i[0]] = 1
-                        
-                        if self.funcoes_objetivo.verificar_restricoes(x_novo, y_jk, h_novo):
-                            if funcao_objetivo == 'f1':
-                                valor = self.funcoes_objetivo.calcular_f1(x_novo, h_novo, y_jk)
-                            else:
-                                valor = self.funcoes_objetivo.calcular_f2(h_novo, y_jk)
-                            
-                            if valor < melhor_valor:
-                                melhor_x, melhor_y, melhor_h = x_novo.copy(), y_jk.copy(), h_novo.copy()
-                                melhor_valor = valor
-                                melhorou = True
-        
-        return melhor_x, melhor_y, melhor_h, melhor_valor, melhorou
+        estado = self._estado_delta(x_ij, y_jk, h_ik)
+        base_do_ativo, equipe_do_ativo = estado['base_do_ativo'], estado['equipe_do_ativo']
+        
+        # Primeira equipe de cada base (-1 se a base não tem equipe)
+        na_base = estado['base_da_equipe'][None, :] == np.arange(self.m_bases)[:, None]
+        primeira_equipe = np.where(na_base.any(axis=1), na_base.argmax(axis=1), -1)
+        
+        # Só entram ativos com equipe e cuja base tem equipe para receber o outro ativo
+        elegiveis = np.flatnonzero((base_do_ativo >= 0) & (equipe_do_ativo >= 0)
+                                   & (primeira_equipe[base_do_ativo] >= 0))
+        
+        # Testa trocar todos os pares de ativos de bases diferentes (varredura determinística).
+        # Com os ativos agrupados por base, cada bloco de uma base é comparado com os blocos
+        # das bases seguintes
+        ordem = elegiveis[np.argsort(base_do_ativo[elegiveis], kind='stable')]
+        base_ordem = base_do_ativo[ordem]
+        pos_i, pos_j = np.nonzero(base_ordem[:, None] < base_ordem[None, :])
+        ativos_i, ativos_j = ordem[pos_i], ordem[pos_j]
+        base_i, base_j = base_ordem[pos_i], base_ordem[pos_j]
+        
+        # Cada ativo vai para a primeira equipe da base do outro
+        ativos = np.column_stack([ativos_i, ativos_j])
+        viavel, delta_f1, delta_f2 = self._avaliar_delta(
+            estado, ativos, equipe_do_ativo[ativos],
+            np.column_stack([primeira_equipe[base_j], primeira_equipe[base_i]]))
+        valores = melhor_valor + (delta_f1 if funcao_objetivo == 'f1' else delta_f2)
+        
+        melhor = self._escolher_melhor(viavel, valores, melhor_valor, estrategia)
+        if melhor < 0:
+            return melhor_x, melhor_y, melhor_h, melhor_valor, False
+        
+        i, j = ativos_i[melhor], ativos_j[melhor]
+        
+        # Troca as bases dos ativos
+        melhor_x[i, base_i[melhor]] = 0
+        melhor_x[i, base_j[melhor]] = 1
+        melhor_x[j, base_j[melhor]] = 0
+        melhor_x[j, base_i[melhor]] = 1
+        
+        # Atualiza equipes
+        melhor_h[i, equipe_do_ativo[i]] = 0
+        melhor_h[j, equipe_do_ativo[j]] = 0
+        melhor_h[i, primeira_equipe[base_j[melhor]]] = 1
+        melhor_h[j, primeira_equipe[base_i[melhor]]] = 1
+        
+        return melhor_x, melhor_y, melhor_h, valores[melhor], True
     
     def two_opt_equipes(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
-                       funcao_objetivo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
-        """TWO-OPT: Move equipe inteira para base vazia se melhora (best improvement)."""
+                       funcao_objetivo: str, valor_inicial: Optional[float] = None,
+                       estrategia: str = 'best') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
+        """TWO-OPT: Move equipe inteira para base vazia se melhora (best ou first improvement)."""
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        if funcao_objetivo == 'f1':
+        if valor_inicial is not None:
+            melhor_valor = valor_inicial
+        elif funcao_objetivo == 'f1':
             melhor_valor = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
         else:
             melhor_valor = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
         
+        # Mover uma equipe de base não muda o número de equipes usadas: nunca melhora f2
+        if funcao_objetivo == 'f2':
+            return melhor_x, melhor_y, melhor_h, melhor_valor, False
+        
         melhorou = False
         
-        # Para cada equipe ativa, tenta mover para bases vazias
-        for k in range(self.s_equipes):
-            base_atual = np.where(y_jk[:, k] == 1)[0]
-            if len(base_atual) > 0:
-                base_atual = base_atual[0]
-                ativos_equipe = np.where(h_ik[:, k] == 1)[0]
-                
-                if len(ativos_equipe) > 0:
-                    # Tenta mover para bases vazias
-                    bases_vazias = np.where(np.sum(y_jk, axis=1) == 0)[0]
+        _, equipe_do_ativo, base_da_equipe, ativos_por_equipe = self._pack(x_ij, y_jk, h_ik)
+        melhor_movimento = None
+        
+        violacao_atual, _ = self.funcoes_objetivo.avaliar_solucao_cache(x_ij, y_jk, h_ik, funcao_objetivo)
+        if violacao_atual == 0.0:
+            # Partindo de uma solução viável, levar a equipe k (com seus ativos) para uma base
+            # vazia mantém todas as restrições, e f1 muda só pelas distâncias dos ativos de k:
+            # custo[k, j] = soma das distâncias dos ativos da equipe k até a base j
+            custo = h_ik.T @ self.distancias
+            delta = custo - custo[np.arange(self.s_equipes), base_da_equipe][:, None]
+            candidatos = (((base_da_equipe >= 0) & (ativos_por_equipe > 0))[:, None]
+                          & ~y_jk.any(axis=1)[None, :])
+            valores = (melhor_valor + delta).ravel()
+            
+            melhor = self._escolher_melhor(candidatos.ravel(), valores, melhor_valor, estrategia)
+            if melhor >= 0:
+                k, j = divmod(melhor, self.m_bases)
+                melhor_movimento = (k, base_da_equipe[k], j, np.flatnonzero(equipe_do_ativo == k))
+                melhor_valor = valores[melhor]
+                melhorou = True
+        else:
+            # melhor_x/melhor_y servem de cópias de trabalho: cada candidato é aplicado nelas
+            # e desfeito depois da avaliação; o melhor movimento só é aplicado no final
+            x_novo, y_novo = melhor_x, melhor_y
+            
+            # Para cada equipe ativa, tenta mover para bases vazias
+            for k in range(self.s_equipes):
+                base_atual = base_da_equipe[k]
+                if base_atual >= 0:
+                    ativos_equipe = np.flatnonzero(equipe_do_ativo == k)
                     
-                    for j in bases_vazias:
-                        y_novo = y_jk.copy()
-                        x_novo = x_ij.copy()
-                        
-                        # Move equipe para nova base
-                        y_novo[base_atual, k] = 0
-                        y_novo[j, k] = 1
+                    if len(ativos_equipe) > 0:
+                        # Tenta mover para bases vazias
+                        bases_vazias = np.where(np.sum(y_jk, axis=1) == 0)[0]
                         
-                        # Move todos os ativos da equipe para a nova base
-                        for ativo in ativos_equipe:
-                            x_novo[ativo, base_atual] = 0
-                            x_novo[ativo, j] = 1
-                        
-                        if self.funcoes_objetivo.verificar_restricoes(x_novo, y_novo, h_ik):
-                            if funcao_objetivo == 'f1':
-                                valor = self.funcoes_objetivo.calcular_f1(x_novo, h_ik, y_novo)
-                            else:
-                                valor = self.funcoes_objetivo.calcular_f2(h_ik, y_novo)
+                        for j in bases_vazias:
+                            # Guarda as células de x que serão sobrescritas
+                            x_antes_atual = x_novo[ativos_equipe, base_atual].copy()
+                            x_antes_j = x_novo[ativos_equipe, j].copy()
                             
-                            if valor < melhor_valor:
-                                melhor_x, melhor_y, melhor_h = x_novo.copy(), y_novo.copy(), h_ik.copy()
-                                melhor_valor = valor
-                                melhorou = True
+                            # Move equipe para nova base
+                            y_novo[base_atual, k] = 0
+                            y_novo[j, k] = 1
+                            
+                            # Move todos os ativos da equipe para a nova base
+                            x_novo[ativos_equipe, base_atual] = 0
+                            x_novo[ativos_equipe, j] = 1
+                            
+                            violacao, valor = self.funcoes_objetivo.avaliar_solucao(x_novo, y_novo, h_ik, funcao_objetivo)
+                            if violacao == 0.0:
+                                if valor < melhor_valor:
+                                    melhor_movimento = (k, base_atual, j, ativos_equipe)
+                                    melhor_valor = valor
+                                    melhorou = True
+                            
+                            # Desfaz o movimento (j era base vazia)
+                            y_novo[j, k] = 0
+                            y_novo[base_atual, k] = 1
+                            x_novo[ativos_equipe, j] = x_antes_j
+                            x_novo[ativos_equipe, base_atual] = x_antes_atual
+                            
+                            if melhorou and estrategia == 'first':
+                                break
+                
+                if melhorou and estrategia == 'first':
+                    break
+        
+        if melhor_movimento is not None:
+            k, base_atual, j, ativos_equipe = melhor_movimento
+            melhor_y[base_atual, k] = 0
+            melhor_y[j, k] = 1
+            melhor_x[ativos_equipe, base_atual] = 0
+            melhor_x[ativos_equipe, j] = 1
         
         return melhor_x, melhor_y, melhor_h, melhor_valor, melhorou
     
     def consolidate_equipes(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
-                          funcao_objetivo: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
-        """CONSOLIDATE: Consolida ativos removendo equipes desnecessarias (para f2)."""
+                          funcao_objetivo: str, valor_inicial: Optional[float] = None,
+                          estrategia: str = 'best') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, bool]:
+        """CONSOLIDATE: Consolida ativos removendo equipes desnecessarias (para f2, sempre first improvement)."""
         melhor_x, melhor_y, melhor_h = x_ij.copy(), y_jk.copy(), h_ik.copy()
         
-        if funcao_objetivo == 'f1':
+        if valor_inicial is not None:
+            melhor_valor = valor_inicial
+        elif funcao_objetivo == 'f1':
             melhor_valor = self.funcoes_objetivo.calcular_f1(x_ij, h_ik, y_jk)
         else:
             melhor_valor = self.funcoes_objetivo.calcular_f2(h_ik, y_jk)
@@ -280,69 +449,72 @@ class BuscaLocal:
         
         # Apenas para f2 - tenta remover equipes
         if funcao_objetivo == 'f2':
-            ativos_por_equipe = np.sum(h_ik, axis=0)
-            equipes_ativas = np.where(ativos_por_equipe > 0)[0]
+            _, equipe_do_ativo, base_da_equipe, ativos_por_equipe = self._pack(x_ij, y_jk, h_ik)
+            equipes_ativas = np.flatnonzero(ativos_por_equipe)
             
             if len(equipes_ativas) > 1:
-                # Escolhe equipe com menos ativos para eliminar
-                equipe_menor = equipes_ativas[np.argmin(ativos_por_equipe[equipes_ativas])]
-                base_equipe_menor = np.where(y_jk[:, equipe_menor] == 1)[0][0]
-                ativos_equipe_menor = np.where(h_ik[:, equipe_menor] == 1)[0]
+                # Estatísticas das equipes ativas tiradas de uma vez do mesmo vetor de cargas:
+                # a menos carregada é eliminada, a mais carregada é o destino da estratégia 2
+                cargas = ativos_por_equipe[equipes_ativas]
+                equipe_menor = equipes_ativas[cargas.argmin()]
+                equipe_maior = equipes_ativas[cargas.argmax()]
+                base_equipe_menor = base_da_equipe[equipe_menor]
+                ativos_equipe_menor = np.flatnonzero(equipe_do_ativo == equipe_menor)
                 
                 # ESTRATÉGIA 1: Tenta consolidar na mesma base (mais barato para f1)
-                outras_equipes_mesma_base = np.where(y_jk[base_equipe_menor, :] == 1)[0]
+                outras_equipes_mesma_base = np.flatnonzero(base_da_equipe == base_equipe_menor)
                 outras_equipes_mesma_base = outras_equipes_mesma_base[outras_equipes_mesma_base != equipe_menor]
                 
                 if len(outras_equipes_mesma_base) > 0:
+                    # melhor_h/melhor_y servem de cópias de trabalho: cada destino é aplicado
+                    # nelas e desfeito se não melhorar
+                    h_novo, y_novo = melhor_h, melhor_y
+                    
                     for equipe_destino in outras_equipes_mesma_base:
-                        h_novo = h_ik.copy()
-                        y_novo = y_jk.copy()
+                        # Guarda o trecho da coluna destino que será sobrescrito
+                        destino_antes = h_novo[ativos_equipe_menor, equipe_destino].copy()
                         
                         # Move todos os ativos para equipe destino
-                        for ativo in ativos_equipe_menor:
-                            h_novo[ativo, equipe_menor] = 0
-                            h_novo[ativo, equipe_destino] = 1
+                        h_novo[ativos_equipe_menor, equipe_menor] = 0
+                        h_novo[ativos_equipe_menor, equipe_destino] = 1
                         
                         # Remove equipe
                         y_novo[base_equipe_menor, equipe_menor] = 0
                         
-                        if self.funcoes_objetivo.verificar_restricoes(x_ij, y_novo, h_novo):
-                            valor = self.funcoes_objetivo.calcular_f2(h_novo, y_novo)
-                            
+                        violacao, valor = self.funcoes_objetivo.avaliar_solucao(x_ij, y_novo, h_novo, 'f2')
+                        if violacao == 0.0:
                             if valor < melhor_valor:
-                                melhor_x, melhor_y, melhor_h = x_ij.copy(), y_novo.copy(), h_novo.copy()
                                 melhor_valor = valor
                                 melhorou = True
                                 break
+                        
+                        # Desfaz o movimento
+                        y_novo[base_equipe_menor, equipe_menor] = 1
+                        h_novo[ativos_equipe_menor, equipe_destino] = destino_antes
+                        h_novo[ativos_equipe_menor, equipe_menor] = 1
                 
                 # ESTRATÉGIA 2: Se não conseguiu na mesma base, tenta mover para equipe mais carregada (qualquer base)
                 if not melhorou:
-                    equipe_maior = equipes_ativas[np.argmax(ativos_por_equipe[equipes_ativas])]
-                    base_equipe_maior = np.where(y_jk[:, equipe_maior] == 1)[0][0]
+                    base_equipe_maior = base_da_equipe[equipe_maior]
                     
                     if equipe_maior != equipe_menor:
                         x_novo = x_ij.copy()
                         h_novo = h_ik.copy()
                         y_novo = y_jk.copy()
                         
-                        # Move todos os ativos da equipe menor para a equipe maior
-                        for ativo in ativos_equipe_menor:
-                            # Atualiza base do ativo
-                            x_novo[ativo, base_equipe_menor] = 0
-                            x_novo[ativo, base_equipe_maior] = 1
-                            
-                            # Atualiza equipe do ativo
-                            h_novo[ativo, equipe_menor] = 0
-                            h_novo[ativo, equipe_maior] = 1
+                        # Move todos os ativos da equipe menor para a equipe maior (base e equipe)
+                        x_novo[ativos_equipe_menor, base_equipe_menor] = 0
+                        x_novo[ativos_equipe_menor, base_equipe_maior] = 1
+                        h_novo[ativos_equipe_menor, equipe_menor] = 0
+                        h_novo[ativos_equipe_menor, equipe_maior] = 1
                         
                         # Remove equipe menor
                         y_novo[base_equipe_menor, equipe_menor] = 0
                         
-                        if self.funcoes_objetivo.verificar_restricoes(x_novo, y_novo, h_novo):
-                            valor = self.funcoes_objetivo.calcular_f2(h_novo, y_novo)
-                            
+                        violacao, valor = self.funcoes_objetivo.avaliar_solucao(x_novo, y_novo, h_novo, 'f2')
+                        if violacao == 0.0:
                             if valor < melhor_valor:
-                                melhor_x, melhor_y, melhor_h = x_novo.copy(), y_novo.copy(), h_novo.copy()
+                                melhor_x, melhor_y, melhor_h = x_novo, y_novo, h_novo
                                 melhor_valor = valor
                                 melhorou = True
         
@@ -351,7 +523,8 @@ class BuscaLocal:
     def busca_local_best_improvement(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
                                     funcao_objetivo: str = 'f1') -> Tuple[np.ndarray, np.ndarray, np.ndarray, float]:
         """Busca local com BEST IMPROVEMENT: testa todas as vizinhancas e escolhe a melhor."""
-        x_atual, y_atual, h_atual = x_ij.copy(), y_jk.copy(), h_ik.copy()
+        # Matrizes binárias sempre em uint8 (astype já devolve uma cópia)
+        x_atual, y_atual, h_atual = (m.astype(np.uint8) for m in (x_ij, y_jk, h_ik))
         
         if funcao_objetivo == 'f1':
             valor_atual = self.funcoes_objetivo.calcular_f1(x_atual, h_atual, y_atual)
@@ -371,7 +544,7 @@ class BuscaLocal:
             
             # Vizinhanca 1: SHIFT (move ativo entre equipes)
             x_shift, y_shift, h_shift, valor_shift, melhorou_shift = self.shift_ativo_equipe(
-                x_atual, y_atual, h_atual, funcao_objetivo)
+                x_atual, y_atual, h_atual, funcao_objetivo, valor_atual)
             
             if melhorou_shift and valor_shift < melhor_valor_iter:
                 melhor_sol_iter = (x_shift, y_shift, h_shift)
@@ -380,7 +553,7 @@ class BuscaLocal:
             
             # Vizinhanca 2: TASK MOVE (move ativo para base mais proxima)
             x_task, y_task, h_task, valor_task, melhorou_task = self.task_move(
-                x_atual, y_atual, h_atual, funcao_objetivo)
+                x_atual, y_atual, h_atual, funcao_objetivo, valor_atual)
             
             if melhorou_task and valor_task < melhor_valor_iter:
                 melhor_sol_iter = (x_task, y_task, h_task)
@@ -389,7 +562,7 @@ class BuscaLocal:
             
             # Vizinhanca 3: SWAP (troca ativos entre bases)
             x_swap, y_swap, h_swap, valor_swap, melhorou_swap = self.swap_ativos_bases(
-                x_atual, y_atual, h_atual, funcao_objetivo)
+                x_atual, y_atual, h_atual, funcao_objetivo, valor_atual)
             
             if melhorou_swap and valor_swap < melhor_valor_iter:
                 melhor_sol_iter = (x_swap, y_swap, h_swap)
@@ -398,7 +571,7 @@ class BuscaLocal:
             
             # Vizinhanca 5: TWO-OPT (move equipes para bases vazias)
             x_two, y_two, h_two, valor_two, melhorou_two = self.two_opt_equipes(
-                x_atual, y_atual, h_atual, funcao_objetivo)
+                x_atual, y_atual, h_atual, funcao_objetivo, valor_atual)
             
             if melhorou_two and valor_two < melhor_valor_iter:
                 melhor_sol_iter = (x_two, y_two, h_two)
@@ -408,7 +581,7 @@ class BuscaLocal:
             # Para f2: tenta consolidar equipes
             if funcao_objetivo == 'f2':
                 x_cons, y_cons, h_cons, valor_cons, melhorou_cons = self.consolidate_equipes(
-                    x_atual, y_atual, h_atual, funcao_objetivo)
+                    x_atual, y_atual, h_atual, funcao_objetivo, valor_atual)
                 
                 if melhorou_cons and valor_cons < melhor_valor_iter:
                     melhor_sol_iter = (x_cons, y_cons, h_cons)
@@ -445,15 +618,18 @@ class BuscaLocal:
         """
         # Define ordem das vizinhanças
         if funcao_objetivo == 'f2':
-            # Para f2, inclui consolidate_equipes
+            # Para f2, inclui consolidate_equipes e deixa de fora two_opt_equipes (mover uma
+            # equipe de base não muda f2). Nenhuma vizinhança aloca equipes novas, então com
+            # menos de 2 equipes alocadas não há o que consolidar durante todo o VND
             neighborhoods = [
                 self.shift_ativo_equipe,
                 self.task_move,
-                self.swap_ativos_bases,
-                self.two_opt_equipes,
-                self.consolidate_equipes
+                self.swap_ativos_bases
             ]
-            neighborhood_names = ['Shift', 'TaskMove', 'Swap', 'TwoOpt', 'Consolidate']
+            neighborhood_names = ['Shift', 'TaskMove', 'Swap']
+            if np.count_nonzero(y_jk.any(axis=0)) >= 2:
+                neighborhoods.append(self.consolidate_equipes)
+                neighborhood_names.append('Consolidate')
         else:
             # Para f1, não usa consolidate_equipes
             neighborhoods = [
@@ -466,13 +642,11 @@ class BuscaLocal:
         
         l_max = len(neighborhoods)
         
-        # Solução atual
-        x_atual, y_atual, h_atual = x_ij.copy(), y_jk.copy(), h_ik.copy()
+        # Solução atual, sempre em uint8 (astype já devolve uma cópia)
+        x_atual, y_atual, h_atual = (m.astype(np.uint8) for m in (x_ij, y_jk, h_ik))
         
-        if funcao_objetivo == 'f1':
-            valor_atual = self.funcoes_objetivo.calcular_f1(x_atual, h_atual, y_atual)
-        else:
-            valor_atual = self.funcoes_objetivo.calcular_f2(h_atual, y_atual)
+        violacao_atual, valor_atual = self.funcoes_objetivo.avaliar_solucao_cache(
+            x_atual, y_atual, h_atual, funcao_objetivo)
         
         # Loop VND
         l = 0  # Índice da vizinhança atual
@@ -481,74 +655,91 @@ class BuscaLocal:
         while l < l_max:
             iteracoes_vnd += 1
             
-            # Explora vizinhança N_l
+            # Explora vizinhança N_l com first improvement: qualquer melhoria já reinicia
+            # o VND em N_1, então varrer o resto de N_l seria trabalho perdido
             x_viz, y_viz, h_viz, valor_viz, melhorou = neighborhoods[l](
-                x_atual, y_atual, h_atual, funcao_objetivo)
+                x_atual, y_atual, h_atual, funcao_objetivo, valor_inicial=valor_atual, estrategia='first')
             
-            # Usa Tournament Selection para comparar
-            sol_atual = (x_atual, y_atual, h_atual)
-            sol_viz = (x_viz, y_viz, h_viz)
-            sol_escolhida, aceita = self.tournament_selection(sol_atual, sol_viz, funcao_objetivo)
+            # Usa Tournament Selection para comparar. Sem melhoria a vizinhança devolve a
+            # própria solução atual, que o torneio rejeitaria (empate)
+            aceita = False
+            if melhorou:
+                violacao_viz, _ = self.funcoes_objetivo.avaliar_solucao_cache(x_viz, y_viz, h_viz, funcao_objetivo)
+                aceita = self.tournament_selection(valor_atual, violacao_atual, valor_viz, violacao_viz)
             
             if aceita:
                 # Encontrou melhoria, reinicia para primeira vizinhança
-                x_atual, y_atual, h_atual = sol_escolhida
-                valor_atual = valor_viz
+                x_atual, y_atual, h_atual = x_viz, y_viz, h_viz
+                valor_atual, violacao_atual = valor_viz, violacao_viz
                 if verbose:
-                    print(f"      VND: {neighborhood_names[l]} melhorou -> {valor_viz:.2f}, reinicia", flush=True)
+                    logger.debug("      VND: %s melhorou -> %.2f, reinicia", neighborhood_names[l], valor_viz)
                 l = 0  # Reinicia
             else:
                 # Não encontrou melhoria, vai para próxima vizinhança
                 l += 1
         
         if verbose:
-            print(f"      VND concluido: {iteracoes_vnd} iteracoes, valor final: {valor_atual:.2f}", flush=True)
+            logger.debug("      VND concluido: %d iteracoes, valor final: %.2f", iteracoes_vnd, valor_atual)
         
         return x_atual, y_atual, h_atual, valor_atual
     
     def shake_adaptativo(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray, 
                         intensidade: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Shake adaptativo com intensidade variavel."""
-        x_shake = x_ij.copy()
-        y_shake = y_jk.copy()
-        h_shake = h_ik.copy()
+        # Matrizes binárias sempre em uint8 (astype já devolve uma cópia)
+        x_shake = x_ij.astype(np.uint8)
+        y_shake = y_jk.astype(np.uint8)
+        h_shake = h_ik.astype(np.uint8)
         
         # Calcula numero de perturbacoes baseado na intensidade
         n_perturbacoes = max(5, int(self.n_ativos * intensidade * 0.15))
         n_perturbacoes = min(n_perturbacoes, self.n_ativos // 3)
         
-        ativos_perturbar = np.random.choice(self.n_ativos, n_perturbacoes, replace=False)
-        
-        for i in ativos_perturbar:
-            base_atual = np.where(x_shake[i, :] == 1)[0][0]
-            
-            # Escolhe nova base baseada na distancia
-            bases_validas = np.where(np.sum(y_shake, axis=1) > 0)[0]
-            bases_validas = bases_validas[bases_validas != base_atual]
-            
-            if len(bases_validas) > 0:
-                # 70% chance de escolher base proxima, 30% aleatoria
-                if np.random.random() < 0.7:
-                    distancias_validas = self.distancias[i, bases_validas]
-                    indices_ordenados = np.argsort(distancias_validas)
-                    bases_proximas = bases_validas[indices_ordenados[:min(3, len(bases_validas))]]
-                    nova_base = np.random.choice(bases_proximas)
-                else:
-                    nova_base = np.random.choice(bases_validas)
-                
-                # Move ativo
-                x_shake[i, base_atual] = 0
-                x_shake[i, nova_base] = 1
-                
-                # Atualiza equipe
-                equipe_antiga = np.where(h_shake[i, :] == 1)[0][0]
+        ativos_perturbar = self.rng.choice(self.n_ativos, size=n_perturbacoes, replace=False)
+        
+        # Bases candidatas de cada ativo perturbado, da mais próxima para a mais distante:
+        # apenas bases com equipe e diferentes da base atual (argmax de uma linha binária é a
+        # posição do seu 1; ativos sem base ficam de fora, como nas vizinhanças)
+        x_perturbar = x_shake[ativos_perturbar]
+        bases_atuais = x_perturbar.argmax(axis=1)
+        ordem = self._base_order[ativos_perturbar]
+        validas = y_shake.any(axis=1)[ordem] & (ordem != bases_atuais[:, None])
+        n_validas = validas.sum(axis=1)
+        posicao = np.cumsum(validas, axis=1) - 1
+        
+        mover = (n_validas > 0) & x_perturbar.any(axis=1)
+        ativos_mover = ativos_perturbar[mover]
+        
+        # Sorteio vetorizado: 70% de chance entre as 3 bases válidas mais próximas,
+        # 30% entre todas as bases válidas
+        proxima = self.rng.random(len(ativos_mover)) < 0.7
+        limite = np.where(proxima, np.minimum(3, n_validas[mover]), n_validas[mover])
+        sorteio = self.rng.integers(0, limite)
+        
+        escolhida = validas[mover] & (posicao[mover] == sorteio[:, None])
+        novas_bases = ordem[mover][np.arange(len(ativos_mover)), escolhida.argmax(axis=1)]
+        
+        # Move os ativos de base
+        x_shake[ativos_mover, bases_atuais[mover]] = 0
+        x_shake[ativos_mover, novas_bases] = 1
+        
+        # -1 para ativo sem equipe (não há equipe a liberar)
+        h_mover = h_shake[ativos_mover]
+        equipes_antigas = np.where(h_mover.any(axis=1), h_mover.argmax(axis=1), -1)
+        ativos_por_equipe = np.sum(h_shake, axis=0, dtype=np.int64)
+        
+        # A equipe escolhida depende da carga deixada pelos ativos anteriores (cada ativo sai
+        # da equipe antiga só na sua vez), então essa parte continua sequencial
+        for i, nova_base, equipe_antiga in zip(ativos_mover, novas_bases, equipes_antigas):
+            # Retira o ativo da equipe antiga
+            if equipe_antiga >= 0:
                 h_shake[i, equipe_antiga] = 0
-                
-                equipes_nova_base = np.where(y_shake[nova_base, :] == 1)[0]
-                if len(equipes_nova_base) > 0:
-                    # Escolhe equipe menos carregada
-                    ativos_por_equipe = np.sum(h_shake, axis=0)
-                    equipe_escolhida = equipes_nova_base[np.argmin(ativos_por_equipe[equipes_nova_base])]
-                    h_shake[i, equipe_escolhida] = 1
+                ativos_por_equipe[equipe_antiga] -= 1
+            
+            equipes_nova_base = np.flatnonzero(y_shake[nova_base])
+            # Escolhe equipe menos carregada
+            equipe_escolhida = equipes_nova_base[np.argmin(ativos_por_equipe[equipes_nova_base])]
+            h_shake[i, equipe_escolhida] = 1
+            ativos_por_equipe[equipe_escolhida] += 1
         
         return x_shake, y_shake, h_shake
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import pickle
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+try:
+    from .log_progresso import configurar_log_progresso
+except ImportError:
+    # Para execução direta do arquivo
+    from log_progresso import configurar_log_progresso
+
+if TYPE_CHECKING:
+    from .monitoramento_ativos_base import MonitoramentoAtivosCompleto
+
+# Diretório onde ficam os DadosProcessor já processados (um arquivo por conteúdo de CSV)
+DIRETORIO_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'tc1')
+
+# Incrementar sempre que o processamento em DadosProcessor mudar (invalida caches antigos)
+VERSAO_CACHE = 4
+
+
+def _chave_arquivo(arquivo_dados: str) -> str:
+    """Hash SHA-1 do conteúdo do CSV (muda sempre que o arquivo muda)."""
+    with open(arquivo_dados, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def carregar_problema(arquivo_dados: str) -> 'MonitoramentoAtivosCompleto':
+    """
+    Cria o MonitoramentoAtivosCompleto reaproveitando o CSV já processado.
+
+    A leitura do CSV e o cálculo da matriz de distâncias são feitos apenas na
+    primeira execução; o DadosProcessor resultante é salvo em ~/.cache/tc1/
+    com chave igual ao hash do conteúdo do arquivo. Dentro de um mesmo processo
+    a instância também é reaproveitada enquanto o arquivo não mudar.
+
+    Args:
+        arquivo_dados: Caminho para o arquivo CSV do problema
+
+    Returns:
+        Instância de MonitoramentoAtivosCompleto pronta para uso
+    """
+    # O pid entra na chave para que workers criados por fork não herdem a instância
+    # do processo pai (e, com ela, o mesmo estado dos geradores aleatórios)
+    return _carregar_problema(os.path.abspath(arquivo_dados), _chave_arquivo(arquivo_dados), os.getpid())
+
+
+@lru_cache(maxsize=None)
+def _carregar_problema(arquivo_dados: str, chave: str, pid: int) -> 'MonitoramentoAtivosCompleto':
+    """Carrega o problema do cache em disco (ou do CSV); memorizado por (caminho, hash, pid)."""
+    # Importado aqui: monitoramento_ativos_base importa algoritmos_vns, que usa o
+    # initializer de workers deste módulo
+    try:
+        from .monitoramento_ativos_base import MonitoramentoAtivosCompleto
+    except ImportError:
+        from monitoramento_ativos_base import MonitoramentoAtivosCompleto
+    
+    arquivo_cache = os.path.join(DIRETORIO_CACHE, f"{chave}_v{VERSAO_CACHE}.pkl")
+
+    if os.path.exists(arquivo_cache):
+        try:
+            with open(arquivo_cache, 'rb') as f:
+                dados_processor = pickle.load(f)
+            return MonitoramentoAtivosCompleto(arquivo_dados, dados_processor=dados_processor)
+        except Exception as e:
+            print(f"Aviso: cache inválido ({e}), recalculando dados...")
+
+    problema = MonitoramentoAtivosCompleto(arquivo_dados)
+
+    # Só salva no cache se os dados foram carregados corretamente
+    if not problema.dados.empty:
+        try:
+            os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+            with open(arquivo_cache, 'wb') as f:
+                pickle.dump(problema.dados_processor, f, protocol=5)
+        except OSError as e:
+            print(f"Aviso: não foi possível salvar o cache ({e})")
+
+    return problema
+
+
+# Problema de cada processo worker dos pools de otimização (ver inicializar_worker)
+_PROBLEMA_WORKER = None
+
+
+def inicializar_worker(arquivo_dados: str) -> None:
+    """
+    Initializer dos ProcessPoolExecutor: carrega o problema uma vez por processo worker.
+    
+    Também liga a saída de progresso do VNS, para que workers criados por spawn
+    (que não herdam a configuração de logging do processo principal) a mostrem.
+    
+    Args:
+        arquivo_dados: Caminho para o arquivo CSV do problema
+    """
+    global _PROBLEMA_WORKER
+    configurar_log_progresso()
+    _PROBLEMA_WORKER = carregar_problema(arquivo_dados)
+
+
+def problema_do_worker() -> 'MonitoramentoAtivosCompleto':
+    """Problema carregado por inicializar_worker no processo worker atual."""
+    if _PROBLEMA_WORKER is None:
+        raise RuntimeError("inicializar_worker não foi executado neste processo")
+    return _PROBLEMA_WORKER
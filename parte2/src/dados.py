@@ -2,6 +2,9 @@ import numpy as np
 import pandas as pd
 from typing import Dict, Tuple
 
+# Raio médio da Terra, para a distância haversine entre coordenadas (lat, lon)
+RAIO_TERRA_KM = 6371.0
+
 class DadosProcessor:
     # Classe que carrega e processa os dados do arquivo CSV
     
@@ -31,20 +34,31 @@ class DadosProcessor:
             13: (-20.12490857385939, -44.12537961904606),  # Mina de Córrego do Feijão
             14: (-20.08768706286346, -43.94249431874169)   # Mina Tamanduá
         }
+        # As mesmas coordenadas em array (m_bases, 2): linha j-1 = (lat, lon) da base j
+        self.bases_coords_arr = np.fromiter(
+            (c for j in range(1, self.m_bases + 1) for c in self.bases_coords[j]), dtype=np.float64
+        ).reshape(self.m_bases, 2)
         
         # Calcula distâncias entre ativos e bases
         self.distancias = self._calcular_distancias()
     
     def _carregar_dados(self, arquivo: str) -> pd.DataFrame:
         """Carrega os dados do arquivo CSV."""
+        colunas = ['lat_base', 'lon_base', 'lat_ativo', 'lon_ativo', 'distancia']
         try:
-            dados = pd.read_csv(arquivo, sep=';', header=None, decimal=',')
-            dados.columns = ['lat_base', 'lon_base', 'lat_ativo', 'lon_ativo', 'distancia']
-            
-            # Converte para float
-            for col in dados.columns:
-                dados[col] = pd.to_numeric(dados[col], errors='coerce')
+            try:
+                # Caminho normal: o parser C já converte tudo para float numa única leitura,
+                # marcando campos vazios/ausentes como NaN
+                dados = pd.read_csv(arquivo, sep=';', header=None, names=colunas, decimal=',',
+                                    dtype=np.float64, na_values=['', 'NA'], engine='c')
+            except ValueError:
+                # Arquivo com algum valor não numérico: lê como texto e converte (vírgula decimal
+                # incluída), para que só as linhas com valores inválidos virem NaN
+                dados = pd.read_csv(arquivo, sep=';', header=None, names=colunas, dtype=str)
+                dados = dados.apply(lambda col: pd.to_numeric(col.str.replace(',', '.', regex=False),
+                                                              errors='coerce'))
             
+            # Uma única passada descarta as linhas incompletas
             dados = dados.dropna()
             return dados
             
@@ -57,31 +71,39 @@ class DadosProcessor:
         # O arquivo tem 125 ativos únicos e 14 bases únicas
         # Precisamos criar uma matriz 125x14 com as distâncias corretas
         
-        # Primeiro, identifica os ativos únicos
-        ativos_unicos = self.dados[['lat_ativo', 'lon_ativo']].drop_duplicates().reset_index(drop=True)
+        # Ativos únicos, na ordem em que aparecem no arquivo
+        ativos_unicos = self.dados[['lat_ativo', 'lon_ativo']].drop_duplicates().to_numpy()
         n_ativos_unicos = len(ativos_unicos)
         
-        # Cria matriz de distâncias
-        distancias = np.zeros((n_ativos_unicos, self.m_bases))
+        # Índice da base de cada linha (coordenadas iguais às da especificação, tolerância 0.001)
+        coords_bases = self.bases_coords_arr
+        mesma_base = ((np.abs(self.dados['lat_base'].to_numpy()[:, None] - coords_bases[:, 0]) < 0.001) &
+                      (np.abs(self.dados['lon_base'].to_numpy()[:, None] - coords_bases[:, 1]) < 0.001))
+        idx_base = np.where(mesma_base.any(axis=1), mesma_base.argmax(axis=1), -1)
+        
+        # Linhas que correspondem a cada ativo único (mesma tolerância de 0.001). np.nonzero
+        # devolve os pares em ordem de ativo e, dentro dele, de linha do arquivo
+        mesmo_ativo = ((np.abs(ativos_unicos[:, None, 0] - self.dados['lat_ativo'].to_numpy()) < 0.001) &
+                       (np.abs(ativos_unicos[:, None, 1] - self.dados['lon_ativo'].to_numpy()) < 0.001))
+        idx_ativo, linhas = np.nonzero(mesmo_ativo)
+        
+        # Para cada par (ativo, base) vale a primeira linha do CSV que corresponde a ele
+        pares = pd.DataFrame({'ativo': idx_ativo, 'base': idx_base[linhas],
+                              'distancia': self.dados['distancia'].to_numpy()[linhas]})
+        pares = pares[pares['base'] >= 0].drop_duplicates(['ativo', 'base'])
+        
+        distancias = np.full((n_ativos_unicos, self.m_bases), np.nan)
+        distancias[pares['ativo'].to_numpy(), pares['base'].to_numpy()] = pares['distancia'].to_numpy()
         
-        # Mapeia cada ativo único para suas distâncias com cada base
-        for i, ativo in ativos_unicos.iterrows():
-            for j, (base_id, (lat_base, lon_base)) in enumerate(self.bases_coords.items(), 1):
-                # Encontra a linha no CSV que corresponde a este ativo e esta base
-                linha = self.dados[
-                    (abs(self.dados['lat_ativo'] - ativo['lat_ativo']) < 0.001) &
-                    (abs(self.dados['lon_ativo'] - ativo['lon_ativo']) < 0.001) &
-                    (abs(self.dados['lat_base'] - lat_base) < 0.001) &
-                    (abs(self.dados['lon_base'] - lon_base) < 0.001)
-                ]
-                
-                if len(linha) > 0:
-                    distancias[i, j-1] = linha['distancia'].iloc[0]
-                else:
-                    # Se não encontrou, calcula distância euclidiana
-                    dist = np.sqrt((ativo['lat_ativo'] - lat_base)**2 + 
-                                 (ativo['lon_ativo'] - lon_base)**2)
-                    distancias[i, j-1] = dist
+        # Pares sem linha no CSV: usa a distância geográfica (haversine, em km como no CSV)
+        faltando = np.isnan(distancias)
+        if faltando.any():
+            lat_ativo, lon_ativo = np.radians(ativos_unicos).T[:, :, None]
+            lat_base, lon_base = np.radians(coords_bases).T[:, None, :]
+            a = (np.sin((lat_base - lat_ativo) / 2)**2 +
+                 np.cos(lat_ativo) * np.cos(lat_base) * np.sin((lon_base - lon_ativo) / 2)**2)
+            haversine = 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(a))
+            distancias[faltando] = haversine[faltando]
         
         # Atualiza o número de ativos para o correto
         self.n_ativos = n_ativos_unicos
@@ -1,4 +1,5 @@
 import numpy as np
+from functools import lru_cache
 from typing import Tuple
 
 class FuncoesObjetivo:
@@ -12,6 +13,11 @@ class FuncoesObjetivo:
         self.s_equipes = monitoramento.s_equipes
         self.eta = monitoramento.eta
         self.distancias = monitoramento.distancias
+        
+        # Cache de viabilidade indexado pelo conteúdo das matrizes (ver verificar_restricoes_cache)
+        self._viabilidade_cache = lru_cache(maxsize=4096)(self._verificar_restricoes_bytes)
+        # Idem para (violação, valor objetivo) (ver avaliar_solucao_cache)
+        self._avaliacao_cache = lru_cache(maxsize=10000)(self._avaliar_solucao_bytes)
     
     def calcular_f1(self, x_ij: np.ndarray, h_ik: np.ndarray, y_jk: np.ndarray) -> float:
         # f1 = soma de todas as distâncias dos ativos até suas respectivas equipes de manutenção
@@ -21,18 +27,14 @@ class FuncoesObjetivo:
         
         # Calcula distância total considerando que cada ativo deve estar próximo de sua equipe
         # A distância é calculada entre o ativo e a base onde sua equipe está alocada
-        distancia_total = 0.0
-        
-        for i in range(self.n_ativos):
-            for k in range(self.s_equipes):
-                if h_ik[i, k] == 1:  # Se ativo i está na equipe k
-                    # Encontra a base onde a equipe k está alocada
-                    for j in range(self.m_bases):
-                        if y_jk[j, k] == 1:  # Se equipe k está na base j
-                            distancia_total += self.distancias[i, j]
-                            break
-        
-        return distancia_total
+        # (primeira base da equipe; equipe sem base não contribui)
+        na_base = y_jk == 1
+        return self._f1_por_base(h_ik, np.where(na_base.any(axis=0), na_base.argmax(axis=0), -1))
+    
+    def _f1_por_base(self, h_ik: np.ndarray, base_equipe: np.ndarray) -> float:
+        """f1 a partir da base de cada equipe (-1 se não tem) já calculada."""
+        distancia_equipe = self.distancias[:, base_equipe]
+        return float(np.where((h_ik == 1) & (base_equipe >= 0), distancia_equipe, 0.0).sum())
     
     def calcular_f2(self, h_ik: np.ndarray, y_jk: np.ndarray = None) -> float:
         # f2 = número de equipes que estão sendo usadas (S)
@@ -50,65 +52,57 @@ class FuncoesObjetivo:
         Calcula a medida quantitativa de violação das restrições.
         Retorna 0 se a solução é viável, caso contrário retorna a soma das violações ao quadrado.
         """
-        violacao_total = 0.0
+        return self._violacao_por_somas(x_ij, y_jk, h_ik, self._somas(x_ij, y_jk, h_ik))
+    
+    def _somas(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray) -> dict:
+        """
+        Somas por linha/coluna e atribuições derivadas das matrizes, calculadas uma vez
+        e compartilhadas por f1, f2 e violação (ver avaliar_solucao e calcular_objetivo_pw/pe).
         
-        # Restrição 1: cada equipe tem que estar em exatamente uma base (se estiver sendo usada)
-        for k in range(self.s_equipes):
-            soma_equipe = np.sum(y_jk[:, k])
-            ativos_equipe = np.sum(h_ik[:, k])
-            
-            # Equipe não pode estar em mais de uma base
-            if soma_equipe > 1:
-                violacao_total += (soma_equipe - 1)**2
-            
-            # Se tem ativos, tem que estar em exatamente uma base
-            if ativos_equipe > 0 and soma_equipe != 1:
-                violacao_total += (abs(soma_equipe - 1))**2
-            
-            # Se está numa base, tem que ter ativos
-            if soma_equipe == 1 and ativos_equipe == 0:
-                violacao_total += 1.0
-        
-        # Restrição 2: cada ativo tem que estar em exatamente uma base
-        for i in range(self.n_ativos):
-            soma_bases = np.sum(x_ij[i, :])
-            if soma_bases != 1:
-                violacao_total += (soma_bases - 1)**2
-        
-        # Restrição 3: ativo só pode estar numa base se a base tiver pelo menos uma equipe
-        for i in range(self.n_ativos):
-            for j in range(self.m_bases):
-                if x_ij[i, j] == 1:  # se ativo i está na base j
-                    if np.sum(y_jk[j, :]) == 0:  # base j não tem nenhuma equipe
-                        violacao_total += 1.0
-        
-        # Restrição 4: cada ativo tem que estar em exatamente uma equipe
-        for i in range(self.n_ativos):
-            soma_equipes = np.sum(h_ik[i, :])
-            if soma_equipes != 1:
-                violacao_total += (soma_equipes - 1)**2
-        
-        # Restrição 5: ativo só pode estar numa equipe se a equipe estiver na base do ativo
-        for i in range(self.n_ativos):
-            for k in range(self.s_equipes):
-                if h_ik[i, k] == 1:  # se ativo i está na equipe k
-                    # Encontra a base onde o ativo i está alocado
-                    base_ativo = np.where(x_ij[i, :] == 1)[0]
-                    if len(base_ativo) > 0:
-                        base_id = base_ativo[0]
-                        # Verifica se a equipe k está na mesma base onde o ativo i está alocado
-                        if y_jk[base_id, k] != 1:  # equipe k não está na base do ativo
-                            violacao_total += 1.0
-        
-        # Restrição 6: cada equipe tem que ter pelo menos eta*n/s ativos (se estiver sendo usada)
-        for k in range(self.s_equipes):
-            ativos_equipe = np.sum(h_ik[:, k])
-            if ativos_equipe > 0:  # só verifica se a equipe tem ativos
-                minimo_ativos = self.eta * self.n_ativos / self.s_equipes
-                if ativos_equipe < minimo_ativos:
-                    violacao_total += (minimo_ativos - ativos_equipe)**2
-        
-        return violacao_total
+        As somas são em int64: as matrizes são uint8 e "soma - 1" daria a volta em zero.
+        """
+        bases_da_equipe = y_jk.sum(axis=0, dtype=np.int64)
+        return {
+            'bases_da_equipe': bases_da_equipe,
+            'ativos_equipe': h_ik.sum(axis=0, dtype=np.int64),
+            'bases_do_ativo': x_ij.sum(axis=1, dtype=np.int64),
+            'equipes_do_ativo': h_ik.sum(axis=1, dtype=np.int64),
+            'equipes_da_base': y_jk.sum(axis=1, dtype=np.int64),
+            # Primeira base de cada equipe (-1 se não tem) e primeira base de cada ativo
+            'base_equipe': np.where(bases_da_equipe > 0, y_jk.argmax(axis=0), -1),
+            'base_ativo': x_ij.argmax(axis=1),
+        }
+    
+    def _violacao_por_somas(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray, somas: dict) -> float:
+        """Violação total a partir das somas já calculadas por _somas."""
+        bases_da_equipe = somas['bases_da_equipe']
+        ativos_equipe = somas['ativos_equipe']
+        bases_do_ativo = somas['bases_do_ativo']
+        equipes_do_ativo = somas['equipes_do_ativo']
+        equipes_da_base = somas['equipes_da_base']
+        
+        # Restrição 1: equipe em no máximo uma base, exatamente uma se tiver ativos, e com ativos se tiver base
+        excesso = (bases_da_equipe - 1)**2
+        usada = ativos_equipe > 0
+        violacao = int(excesso[bases_da_equipe > 1].sum() + excesso[usada & (bases_da_equipe != 1)].sum())
+        violacao += np.count_nonzero((bases_da_equipe == 1) & ~usada)
+        
+        # Restrições 2 e 4: cada ativo em exatamente uma base e uma equipe ((soma - 1)² já é 0 quando soma = 1)
+        violacao += int((bases_do_ativo - 1) @ (bases_do_ativo - 1))
+        violacao += int((equipes_do_ativo - 1) @ (equipes_do_ativo - 1))
+        
+        # Restrição 3: ativo numa base sem equipe
+        violacao += np.count_nonzero(x_ij[:, equipes_da_base == 0] == 1)
+        
+        # Restrição 5: equipe do ativo fora da (primeira) base do ativo
+        violacao += np.count_nonzero((h_ik == 1) & (y_jk[somas['base_ativo']] != 1) & (bases_do_ativo > 0)[:, None])
+        
+        # Restrição 6: mínimo de eta*n/s ativos por equipe usada
+        minimo_ativos = self.eta * self.n_ativos / self.s_equipes
+        deficit = np.where(usada, np.maximum(minimo_ativos - ativos_equipe, 0.0), 0.0)
+        violacao = float(violacao) + float(deficit @ deficit)
+        
+        return violacao
     
     def verificar_restricoes(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray, epsilon_2: float = None) -> bool:
         """
@@ -121,6 +115,61 @@ class FuncoesObjetivo:
             violacao = self.calcular_violacao(x_ij, y_jk, h_ik)
         return violacao == 0.0
     
+    def avaliar_solucao(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
+                        funcao_objetivo: str = 'f1') -> Tuple[float, float]:
+        """
+        Calcula a violação e o valor objetivo de uma vez só.
+        
+        Equivale a calcular_violacao + calcular_f1/calcular_f2 numa única chamada; usada
+        pelas vizinhanças, que precisam dos dois valores para cada candidato.
+        
+        Args:
+            x_ij, y_jk, h_ik: Variáveis de decisão
+            funcao_objetivo: 'f1' ou 'f2'
+            
+        Returns:
+            (violacao, valor)
+        """
+        somas = self._somas(x_ij, y_jk, h_ik)
+        violacao = self._violacao_por_somas(x_ij, y_jk, h_ik, somas)
+        
+        if funcao_objetivo == 'f1':
+            valor = self._f1_por_base(h_ik, somas['base_equipe'])
+        else:
+            valor = float(np.count_nonzero(somas['ativos_equipe']))
+        
+        return violacao, valor
+    
+    def verificar_restricoes_cache(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray) -> bool:
+        """
+        Mesmo resultado de verificar_restricoes, mas memoriza soluções já verificadas.
+        A chave é o conteúdo (bytes, dtype e shape) das três matrizes.
+        """
+        return self._viabilidade_cache(*((m.tobytes(), m.dtype.str, m.shape) for m in (x_ij, y_jk, h_ik)))
+    
+    def _verificar_restricoes_bytes(self, chave_x: tuple, chave_y: tuple, chave_h: tuple) -> bool:
+        """Reconstrói as matrizes a partir das chaves do cache e verifica as restrições."""
+        x_ij, y_jk, h_ik = (np.frombuffer(dados, dtype=dtype).reshape(shape)
+                            for dados, dtype, shape in (chave_x, chave_y, chave_h))
+        return self.verificar_restricoes(x_ij, y_jk, h_ik)
+    
+    def avaliar_solucao_cache(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
+                              funcao_objetivo: str = 'f1') -> Tuple[float, float]:
+        """
+        Mesmo resultado de avaliar_solucao, mas memoriza soluções já avaliadas (o VNS
+        volta com frequência ao mesmo ótimo local depois do shake + VND).
+        A chave é o conteúdo (bytes, dtype e shape) das três matrizes e a função objetivo.
+        """
+        return self._avaliacao_cache(*((m.tobytes(), m.dtype.str, m.shape) for m in (x_ij, y_jk, h_ik)),
+                                     funcao_objetivo)
+    
+    def _avaliar_solucao_bytes(self, chave_x: tuple, chave_y: tuple, chave_h: tuple,
+                               funcao_objetivo: str) -> Tuple[float, float]:
+        """Reconstrói as matrizes a partir das chaves do cache e avalia a solução."""
+        x_ij, y_jk, h_ik = (np.frombuffer(dados, dtype=dtype).reshape(shape)
+                            for dados, dtype, shape in (chave_x, chave_y, chave_h))
+        return self.avaliar_solucao(x_ij, y_jk, h_ik, funcao_objetivo)
+    
     def calcular_violacao_com_epsilon(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray, epsilon_2: float) -> float:
         """
         Calcula violação incluindo a restrição epsilon (f2 <= epsilon_2).
@@ -165,7 +214,8 @@ class FuncoesObjetivo:
     def calcular_objetivo_pw(self, x_ij: np.ndarray, y_jk: np.ndarray, h_ik: np.ndarray,
                             w1: float, w2: float,
                             f1_min: float, f1_max: float,
-                            f2_min: float, f2_max: float) -> Tuple[float, float, float, bool, float]:
+                            f2_min: float, f2_max: float,
+                            coeficientes: Tuple[float, float] = None) -> Tuple[float, float, float, bool, float]:
         """
         Calcula o objetivo escalarizado usando Weighted Sum (Pw).
         
@@ -173,23 +223,30 @@ class FuncoesObjetivo:
             x_ij, y_jk, h_ik: Variáveis de decisão
             w1, w2: Pesos para f1 e f2 (w1 + w2 = 1)
             f1_min, f1_max, f2_min, f2_max: Limites para normalização
+            coeficientes: (c1, c2) = (w1/(f1_max - f1_min), w2/(f2_max - f2_min)) já
+                          calculados; se None, a normalização é feita a cada chamada
             
         Returns:
             (F_w, f1_raw, f2_raw, is_feasible, violation)
         """
-        # Calcula valores brutos
-        f1_raw = self.calcular_f1(x_ij, h_ik, y_jk)
-        f2_raw = self.calcular_f2(h_ik, y_jk)
-        
-        # Normaliza
-        f1_norm, f2_norm = self.normalize_objectives(f1_raw, f2_raw, 
-                                                      f1_min, f1_max, f2_min, f2_max)
+        # Calcula valores brutos (somas compartilhadas com a verificação de restrições)
+        somas = self._somas(x_ij, y_jk, h_ik)
+        f1_raw = self._f1_por_base(h_ik, somas['base_equipe'])
+        f2_raw = float(np.count_nonzero(somas['ativos_equipe']))
         
-        # Calcula objetivo ponderado
-        F_w = w1 * f1_norm + w2 * f2_norm
+        if coeficientes is not None:
+            # Pesos já divididos pelas faixas de normalização
+            F_w = coeficientes[0] * (f1_raw - f1_min) + coeficientes[1] * (f2_raw - f2_min)
+        else:
+            # Normaliza
+            f1_norm, f2_norm = self.normalize_objectives(f1_raw, f2_raw, 
+                                                          f1_min, f1_max, f2_min, f2_max)
+            
+            # Calcula objetivo ponderado
+            F_w = w1 * f1_norm + w2 * f2_norm
         
         # Verifica restrições
-        violation = self.calcular_violacao(x_ij, y_jk, h_ik)
+        violation = self._violacao_por_somas(x_ij, y_jk, h_ik, somas)
         is_feasible = (violation == 0.0)
         
         return F_w, f1_raw, f2_raw, is_feasible, violation
@@ -207,12 +264,13 @@ class FuncoesObjetivo:
         Returns:
             (f1_raw, f2_raw, is_feasible, violation)
         """
-        # Calcula valores brutos
-        f1_raw = self.calcular_f1(x_ij, h_ik, y_jk)
-        f2_raw = self.calcular_f2(h_ik, y_jk)
+        # Calcula valores brutos (somas compartilhadas com a verificação de restrições)
+        somas = self._somas(x_ij, y_jk, h_ik)
+        f1_raw = self._f1_por_base(h_ik, somas['base_equipe'])
+        f2_raw = float(np.count_nonzero(somas['ativos_equipe']))
         
         # Verifica restrições (incluindo epsilon)
-        violation = self.calcular_violacao(x_ij, y_jk, h_ik)
+        violation = self._violacao_por_somas(x_ij, y_jk, h_ik, somas)
         
         # Adiciona violação da restrição epsilon
         if f2_raw > epsilon_2:
@@ -234,24 +292,50 @@ def nondominatedsolutions(objectives: np.ndarray) -> np.ndarray:
     Returns:
         Array de índices das soluções não-dominadas
     """
-    n_solutions = objectives.shape[0]
-    is_dominated = np.zeros(n_solutions, dtype=bool)
-    
-    for i in range(n_solutions):
-        for j in range(n_solutions):
-            if i != j and not is_dominated[i]:
-                # Verifica se j domina i
-                # j domina i se: j é melhor ou igual em todos objetivos E estritamente melhor em pelo menos um
-                better_or_equal = np.all(objectives[j] <= objectives[i])
-                strictly_better = np.any(objectives[j] < objectives[i])
-                
-                if better_or_equal and strictly_better:
-                    is_dominated[i] = True
-                    break
+    # Com dois objetivos basta ordenar e varrer (O(n log n) em vez de O(n²))
+    if objectives.shape[1] == 2:
+        return np.sort(nd_sort_2d(objectives))
+    
+    # Compara todos os pares de uma vez: posição [j, i] indica se j domina i
+    # j domina i se: j é melhor ou igual em todos objetivos E estritamente melhor em pelo menos um
+    better_or_equal = np.all(objectives[:, None, :] <= objectives[None, :, :], axis=2)
+    strictly_better = np.any(objectives[:, None, :] < objectives[None, :, :], axis=2)
+    is_dominated = np.any(better_or_equal & strictly_better, axis=0)
     
     return np.where(~is_dominated)[0]
 
 
+def nd_sort_2d(pontos: np.ndarray) -> np.ndarray:
+    """
+    Soluções não-dominadas para dois objetivos (minimização) por ordenação e varredura.
+    
+    Ordena por (f1, f2): um ponto é não-dominado se o seu f2 for estritamente
+    menor que o menor f2 dos pontos anteriores (np.minimum.accumulate). Pontos
+    repetidos são mantidos, como em nondominatedsolutions.
+    
+    Args:
+        pontos: Array (n_solutions, 2) com os valores (f1, f2)
+    
+    Returns:
+        Array de índices das soluções não-dominadas, na ordem da varredura (f1, f2)
+    """
+    if len(pontos) == 0:
+        return np.empty(0, dtype=np.intp)
+    
+    ordem = np.lexsort((pontos[:, 1], pontos[:, 0]))
+    ordenados = pontos[ordem]
+    
+    # Menor f2 entre os pontos anteriores na ordenação
+    min_f2_anterior = np.concatenate(([np.inf], np.minimum.accumulate(ordenados[:-1, 1])))
+    estrito = ordenados[:, 1] < min_f2_anterior
+    
+    # Cópias de um ponto ficam juntas na ordenação e seguem a decisão da primeira
+    inicio = np.concatenate(([True], np.any(ordenados[1:] != ordenados[:-1], axis=1)))
+    manter = estrito[np.flatnonzero(inicio)[np.cumsum(inicio) - 1]]
+    
+    return ordem[manter]
+
+
 def selecionar_solucoes_distribuidas(objectives: np.ndarray, indices_nd: np.ndarray, 
                                      max_solutions: int = 20) -> np.ndarray:
     """
@@ -287,9 +371,9 @@ def selecionar_solucoes_distribuidas(objectives: np.ndarray, indices_nd: np.ndar
         # Normaliza objetivo
         obj_range = obj_nd[sorted_idx[-1], m] - obj_nd[sorted_idx[0], m]
         if obj_range > 1e-10:
-            for i in range(1, len(sorted_idx) - 1):
-                crowding[sorted_idx[i]] += (obj_nd[sorted_idx[i+1], m] - 
-                                           obj_nd[sorted_idx[i-1], m]) / obj_range
+            # Pontos internos: distância entre os vizinhos de cada um, de uma vez
+            valores = obj_nd[sorted_idx, m]
+            crowding[sorted_idx[1:-1]] += (valores[2:] - valores[:-2]) / obj_range
     
     # Seleciona soluções com maior crowding distance
     selected_idx = np.argsort(crowding)[-max_solutions:]
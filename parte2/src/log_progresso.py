@@ -0,0 +1,26 @@
+import logging
+import sys
+
+# Configuração da saída de progresso do VNS (loggers dos módulos em src/).
+# Fica num módulo próprio para poder ser usada tanto pelos scripts quanto pelo
+# initializer dos workers (cache_problema) sem importar os algoritmos.
+
+
+class _HandlerBufferizado(logging.StreamHandler):
+    # StreamHandler sem flush a cada registro: o buffer de sys.stdout decide quando escrever
+    # (a saída padrão é esvaziada no fim do processo, inclusive nos workers do multiprocessing)
+    def flush(self):
+        pass
+
+
+def configurar_log_progresso(nivel: int = logging.INFO) -> None:
+    """
+    Mostra o progresso do VNS (loggers dos módulos em src/) na saída padrão.
+    
+    Não faz nada se o logging já estiver configurado, então pode ser chamada tanto no
+    processo principal quanto no initializer dos workers (necessário quando o pool usa spawn).
+    
+    Args:
+        nivel: logging.INFO mostra início, iterações e parada; logging.DEBUG também shake e VND
+    """
+    logging.basicConfig(level=nivel, format='%(message)s', handlers=[_HandlerBufferizado(sys.stdout)])
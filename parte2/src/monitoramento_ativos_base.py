@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 import networkx as nx
 from scipy.optimize import minimize
 import seaborn as sns
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 import warnings
 import random
 import os
@@ -33,16 +33,20 @@ except ImportError:
 class MonitoramentoAtivosCompleto:
     # Classe principal que coordena todo o problema de monitoramento de ativos
     
-    def __init__(self, arquivo_dados: str):
+    def __init__(self, arquivo_dados: str, dados_processor: DadosProcessor = None):
         # Inicializa o problema carregando os dados e criando todas as classes necessárias
-        # Inicializa processador de dados
-        self.dados_processor = DadosProcessor(arquivo_dados)
+        # Inicializa processador de dados (ou reaproveita um já processado, ex.: vindo do cache)
+        self.arquivo_dados = arquivo_dados
+        if dados_processor is None:
+            dados_processor = DadosProcessor(arquivo_dados)
+        self.dados_processor = dados_processor
         self.dados = self.dados_processor.dados
         self.n_ativos = self.dados_processor.n_ativos
         self.m_bases = self.dados_processor.m_bases
         self.s_equipes = self.dados_processor.s_equipes
         self.eta = self.dados_processor.eta
         self.bases_coords = self.dados_processor.bases_coords
+        self.bases_coords_arr = self.dados_processor.bases_coords_arr
         self.distancias = self.dados_processor.distancias
         
         # Inicializa módulos especializados
@@ -52,18 +56,41 @@ class MonitoramentoAtivosCompleto:
         self.algoritmo_vns = AlgoritmoVNS(self)
         self.visualizador = Visualizador(self)
         self.gerador_relatorios = GeradorRelatorios(self)
+        
+        # VNS, shake e soluções iniciais sorteiam de um único gerador
+        self.semear()
+    
+    def semear(self, seed=None) -> np.random.Generator:
+        """
+        Cria um único gerador aleatório e o entrega ao VNS, à busca local e ao gerador de soluções.
+        
+        Único ponto de (re)semeadura do problema: com a mesma seed, uma execução do VNS
+        sobre este problema é reprodutível.
+        
+        Args:
+            seed: Semente (int, SeedSequence ou None para entropia nova)
+            
+        Returns:
+            O gerador compartilhado
+        """
+        rng = np.random.default_rng(seed)
+        self.algoritmo_vns.rng = rng
+        self.busca_local.rng = rng
+        self.gerador_solucoes.rng = rng
+        return rng
     
-    def otimizacao_mono_objetivo(self, n_execucoes: int = 5) -> Dict:
+    def otimizacao_mono_objetivo(self, n_execucoes: int = 5, semente: Optional[int] = None) -> Dict:
         """
         Executa otimização mono-objetivo para f1 e f2.
         
         Args:
             n_execucoes: Número de execuções para cada função
+            semente: Semente da rodada (None = nova; a usada é impressa para poder repetir)
             
         Returns:
             Resultados das otimizações
         """
-        return self.algoritmo_vns.otimizacao_mono_objetivo(n_execucoes)
+        return self.algoritmo_vns.otimizacao_mono_objetivo(n_execucoes, semente)
     
     def plotar_curvas_convergencia(self, resultados: Dict):
         """Plota curvas de convergência detalhadas."""
@@ -90,10 +117,12 @@ def main():
     print("Iniciando Trabalho Computacional - Monitoramento de Ativos")
     print("=" * 60)
     
-    # Inicializa o problema
-    monitoramento = MonitoramentoAtivosCompleto(
-        'data/probdata.csv'
-    )
+    # Inicializa o problema (reaproveita o CSV já processado quando houver cache)
+    try:
+        from .cache_problema import carregar_problema
+    except ImportError:
+        from cache_problema import carregar_problema
+    monitoramento = carregar_problema('data/probdata.csv')
     
     if monitoramento.dados.empty:
         print("Erro: Não foi possível carregar os dados.")
@@ -0,0 +1,38 @@
+import os
+import numpy as np
+from typing import Dict
+
+# Funções auxiliares para salvar e recarregar os arrays gerados pelos scripts de otimização.
+# Usa o formato .npz comprimido do próprio numpy (shape e dtype ficam no cabeçalho de cada array).
+
+
+def salvar_arrays(caminho: str, *arrays: np.ndarray, **arrays_nomeados: np.ndarray) -> None:
+    """
+    Salva um ou mais arrays em um único arquivo .npz comprimido.
+
+    Matrizes binárias (x_ij, y_jk, h_ik) devem ser passadas como uint8: com apenas
+    0/1 por byte a compressão fica muito mais eficiente do que em int64/float64.
+
+    Args:
+        caminho: Caminho do arquivo de saída (.npz)
+        arrays: Arrays posicionais (salvos como arr_0, arr_1, ...)
+        arrays_nomeados: Arrays salvos com o nome da chave
+    """
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    np.savez_compressed(caminho, *arrays, **arrays_nomeados)
+
+
+def carregar_arrays(caminho: str) -> Dict[str, np.ndarray]:
+    """
+    Carrega todos os arrays de um arquivo salvo com salvar_arrays.
+
+    Args:
+        caminho: Caminho do arquivo .npz
+
+    Returns:
+        Dicionário {nome: array}
+    """
+    with np.load(caminho) as dados:
+        return {nome: dados[nome] for nome in dados.files}
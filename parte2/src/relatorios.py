@@ -15,21 +15,17 @@ class GeradorRelatorios:
     def gerar_relatorio_mono_objetivo(self, resultados: Dict) -> str:
         # Gera relatorio completo com todas as informacoes para o LaTeX
         
-        # Calcula estatisticas detalhadas
-        f1_valores = [r['valor_objetivo'] for r in resultados['f1']['execucoes']]
-        f2_valores = [r['valor_objetivo'] for r in resultados['f2']['execucoes']]
-        
         # Encontra as melhores solucoes
         melhor_f1 = min(resultados['f1']['execucoes'], key=lambda x: x['valor_objetivo'])
         melhor_f2 = min(resultados['f2']['execucoes'], key=lambda x: x['valor_objetivo'])
         
-        # Analisa distribuicao de ativos por equipe na melhor solucao f2
-        ativos_por_equipe_f2 = np.sum(melhor_f2['h_ik'], axis=0)
-        equipes_utilizadas_f2 = np.sum(ativos_por_equipe_f2 > 0)
-        
-        # Analisa bases utilizadas na melhor solucao f1
-        bases_utilizadas_f1 = np.sum(np.sum(melhor_f1['y_jk'], axis=1) > 0)
-        bases_utilizadas_f2 = np.sum(np.sum(melhor_f2['y_jk'], axis=1) > 0)
+        # Agregados das melhores solucoes, calculados uma vez e so formatados no texto abaixo
+        ativos_por_equipe_f1 = melhor_f1['h_ik'].sum(axis=0)
+        ativos_por_equipe_f2 = melhor_f2['h_ik'].sum(axis=0)
+        equipes_utilizadas_f1 = np.count_nonzero(ativos_por_equipe_f1)
+        equipes_utilizadas_f2 = np.count_nonzero(ativos_por_equipe_f2)
+        bases_utilizadas_f1 = np.count_nonzero(melhor_f1['y_jk'].sum(axis=1))
+        bases_utilizadas_f2 = np.count_nonzero(melhor_f2['y_jk'].sum(axis=1))
         
         relatorio = f"""
 ========================================
@@ -122,7 +118,7 @@ Funcao f2 (Minimizacao do Numero de Equipes):
 Melhor solucao f1:
 - Valor da funcao: {melhor_f1['valor_objetivo']:.2f} km
 - Bases utilizadas: {bases_utilizadas_f1}
-- Equipes utilizadas: {np.sum(np.sum(melhor_f1['h_ik'], axis=0) > 0)}
+- Equipes utilizadas: {equipes_utilizadas_f1}
 - Arquivo: resultados/graficos/melhor_solucao_f1.png
 
 Melhor solucao f2:
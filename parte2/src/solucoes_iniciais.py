@@ -1,10 +1,10 @@
 import numpy as np
-from typing import List, Tuple
+from typing import Optional, Tuple
 
 class GeradorSolucoes:
     # Classe que gera soluções iniciais para o problema usando heurísticas
     
-    def __init__(self, monitoramento):
+    def __init__(self, monitoramento, seed: Optional[int] = None):
         # Pega os dados do problema da classe principal
         self.monitoramento = monitoramento
         self.n_ativos = monitoramento.n_ativos
@@ -12,6 +12,15 @@ class GeradorSolucoes:
         self.s_equipes = monitoramento.s_equipes
         self.eta = monitoramento.eta
         self.distancias = monitoramento.distancias
+        
+        # A ordem de centralidade só depende das distâncias, que não mudam: calcula uma vez
+        # (ordenação estável para manter o desempate pelo índice da base)
+        # Guardada como ndarray somente leitura, já que a mesma instância é devolvida a cada chamada
+        self._bases_ordenadas = np.argsort(self.distancias.mean(axis=0), kind='stable')
+        self._bases_ordenadas.setflags(write=False)
+        
+        # Gerador aleatório das heurísticas (o AlgoritmoVNS substitui pelo seu, ver algoritmos_vns)
+        self.rng = np.random.default_rng(seed)
     
     def gerar_solucao_inicial(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -23,84 +32,128 @@ class GeradorSolucoes:
             h_ik: Atribuição de ativos às equipes
         """
         # Inicializa variáveis
-        x_ij = np.zeros((self.n_ativos, self.m_bases), dtype=int)
-        y_jk = np.zeros((self.m_bases, self.s_equipes), dtype=int)
-        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=int)
+        x_ij = np.zeros((self.n_ativos, self.m_bases), dtype=np.uint8)
+        y_jk = np.zeros((self.m_bases, self.s_equipes), dtype=np.uint8)
+        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=np.uint8)
         
         # Passo 1: Aloca TODAS as equipes as bases para minimizar f1
         # Distribui equipes entre as bases mais centrais
         bases_ordenadas = self._ordenar_bases_por_centralidade()
         
         # Usa TODAS as 8 equipes para melhorar f1 (menor distancia)
-        for k in range(self.s_equipes):
-            # Distribui equipes entre as bases mais centrais
-            # Permite multiplas equipes na mesma base se necessario
-            if np.random.random() < 0.5:  # 50% nas bases mais centrais
-                base_escolhida = bases_ordenadas[k % min(4, len(bases_ordenadas))]
-            else:  # 50% distribuidas
-                base_escolhida = bases_ordenadas[k % len(bases_ordenadas)]
-            y_jk[base_escolhida, k] = 1
+        # Distribui equipes entre as bases mais centrais
+        # Permite multiplas equipes na mesma base se necessario
+        equipes = np.arange(self.s_equipes)
+        nas_centrais = self.rng.random(self.s_equipes) < 0.5  # 50% nas bases mais centrais
+        bases_escolhidas = np.where(nas_centrais,
+                                    bases_ordenadas[equipes % min(4, self.m_bases)],
+                                    bases_ordenadas[equipes % self.m_bases])  # 50% distribuidas
+        y_jk[bases_escolhidas, equipes] = 1
         
         # Passo 2: Atribui ativos as bases MAIS PROXIMAS (para minimizar f1)
-        for i in range(self.n_ativos):
-            # Encontra bases com equipes
-            bases_com_equipes = np.where(np.sum(y_jk, axis=1) > 0)[0]
-            
-            if len(bases_com_equipes) > 0:
-                # SEMPRE escolhe a base mais proxima para minimizar f1
-                distancias_validas = self.distancias[i, bases_com_equipes]
-                base_mais_proxima = bases_com_equipes[np.argmin(distancias_validas)]
-                x_ij[i, base_mais_proxima] = 1
+        # Encontra bases com equipes
+        bases_com_equipes = np.flatnonzero(y_jk.any(axis=1))
+        
+        if len(bases_com_equipes) > 0:
+            # SEMPRE escolhe a base mais proxima para minimizar f1 (todos os ativos de uma vez)
+            base_mais_proxima = bases_com_equipes[self.distancias[:, bases_com_equipes].argmin(axis=1)]
+            x_ij[np.arange(self.n_ativos), base_mais_proxima] = 1
         
         # Passo 3: Atribui ativos às equipes (com balanceamento melhorado)
-        h_ik = self._balancear_atribuicao_equipes(x_ij, y_jk)
+        self._balancear_atribuicao_equipes(x_ij, y_jk, out=h_ik)
         
         return x_ij, y_jk, h_ik
     
-    def _ordenar_bases_por_centralidade(self) -> List[int]:
-        """Ordena bases por centralidade (menor distância média aos ativos)."""
-        distancias_medias = []
-        for j in range(self.m_bases):
-            dist_media = np.mean(self.distancias[:, j])
-            distancias_medias.append((j, dist_media))
+    def gerar_populacao_inicial(self, n_pop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gera n_pop soluções de gerar_solucao_inicial de uma vez (passos 1 e 2 vetorizados).
+        
+        Consome o gerador aleatório na mesma ordem que n_pop chamadas sucessivas a
+        gerar_solucao_inicial, portanto X[p], Y[p], H[p] é a p-ésima dessas soluções.
+        
+        Args:
+            n_pop: Número de soluções a gerar
+        
+        Returns:
+            X: Atribuições de ativos às bases, shape (n_pop, n_ativos, m_bases)
+            Y: Alocações de equipes às bases, shape (n_pop, m_bases, s_equipes)
+            H: Atribuições de ativos às equipes, shape (n_pop, n_ativos, s_equipes)
+        """
+        X = np.zeros((n_pop, self.n_ativos, self.m_bases), dtype=np.uint8)
+        Y = np.zeros((n_pop, self.m_bases, self.s_equipes), dtype=np.uint8)
+        H = np.zeros((n_pop, self.n_ativos, self.s_equipes), dtype=np.uint8)
         
-        distancias_medias.sort(key=lambda x: x[1])
-        return [base_id for base_id, _ in distancias_medias]
+        # Passo 1: mesma regra de gerar_solucao_inicial, sorteando todas as equipes da população
+        bases_ordenadas = self._ordenar_bases_por_centralidade()
+        equipes = np.arange(self.s_equipes)
+        nas_centrais = self.rng.random((n_pop, self.s_equipes)) < 0.5
+        bases_escolhidas = np.where(nas_centrais,
+                                    bases_ordenadas[equipes % min(4, self.m_bases)],
+                                    bases_ordenadas[equipes % self.m_bases])
+        Y[np.arange(n_pop)[:, None], bases_escolhidas, equipes] = 1
+        
+        # Passo 2: base mais próxima entre as que têm equipe, para todas as soluções juntas
+        # (bases sem equipe recebem distância infinita; o empate continua pelo menor índice)
+        tem_equipe = Y.any(axis=2)
+        distancias_validas = np.where(tem_equipe[:, None, :], self.distancias, np.inf)
+        X[np.arange(n_pop)[:, None], np.arange(self.n_ativos), distancias_validas.argmin(axis=2)] = 1
+        
+        # Passo 3: balanceamento depende da ordem dos ativos, feito solução a solução
+        for p in range(n_pop):
+            self._balancear_atribuicao_equipes(X[p], Y[p], out=H[p])
+        
+        return X, Y, H
+    
+    def _ordenar_bases_por_centralidade(self) -> np.ndarray:
+        """Ordena bases por centralidade (menor distância média aos ativos)."""
+        return self._bases_ordenadas
     
-    def _balancear_atribuicao_equipes(self, x_ij: np.ndarray, y_jk: np.ndarray) -> np.ndarray:
-        """Balanceia atribuição de ativos às equipes."""
-        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=int)
+    def _balancear_atribuicao_equipes(self, x_ij: np.ndarray, y_jk: np.ndarray,
+                                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Balanceia atribuição de ativos às equipes (em out, zerado antes, se for passado)."""
+        if out is None:
+            h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=np.uint8)
+        else:
+            h_ik = out
+            h_ik.fill(0)
+        
+        # y_jk não muda durante o balanceamento: equipes de cada base calculadas uma vez
+        equipes_por_base = [np.flatnonzero(y_jk[j, :] == 1) for j in range(self.m_bases)]
+        
+        # x_ij é one-hot por linha: argmax dá a base de cada ativo, a soma detecta os sem base
+        alocado = x_ij.sum(axis=1) > 0
+        base_do_ativo = x_ij.argmax(axis=1)
+        
+        # Contador de ativos por equipe mantido junto com h_ik (evita somar h_ik a cada ativo)
+        ativos_por_equipe = np.zeros(self.s_equipes, dtype=np.int32)
         
         # Para cada ativo, encontra a equipe da base onde está alocado
         for i in range(self.n_ativos):
-            base_ativo = np.where(x_ij[i, :] == 1)[0]
-            if len(base_ativo) > 0:
-                base_id = base_ativo[0]
-                equipes_base = np.where(y_jk[base_id, :] == 1)[0]
+            if alocado[i]:
+                base_id = base_do_ativo[i]
+                equipes_base = equipes_por_base[base_id]
                 if len(equipes_base) > 0:
                     # Escolhe a equipe com menos ativos
-                    ativos_por_equipe = np.sum(h_ik, axis=0)
                     equipe_escolhida = equipes_base[np.argmin(ativos_por_equipe[equipes_base])]
                     h_ik[i, equipe_escolhida] = 1
+                    ativos_por_equipe[equipe_escolhida] += 1
         
         return h_ik
     
     def _balancear_atribuicao_equipes_melhorado(self, x_ij: np.ndarray, y_jk: np.ndarray) -> np.ndarray:
         """Balanceia atribuição de ativos às equipes com melhor distribuição."""
-        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=int)
+        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=np.uint8)
         
-        # Coleta todos os ativos por base
-        ativos_por_base = {}
-        for i in range(self.n_ativos):
-            base_ativo = np.where(x_ij[i, :] == 1)[0]
-            if len(base_ativo) > 0:
-                base_id = base_ativo[0]
-                if base_id not in ativos_por_base:
-                    ativos_por_base[base_id] = []
-                ativos_por_base[base_id].append(i)
+        # Coleta todos os ativos por base: ordena os ativos alocados pela base (estável, mantém
+        # a ordem dos índices dentro de cada base) e fatia cada grupo contíguo
+        alocado = x_ij.sum(axis=1) > 0
+        base_do_ativo = x_ij.argmax(axis=1)
+        ativos_alocados = np.flatnonzero(alocado)
+        ordem = ativos_alocados[np.argsort(base_do_ativo[ativos_alocados], kind='stable')]
+        bases, inicios = np.unique(base_do_ativo[ordem], return_index=True)
         
         # Distribui ativos entre equipes de cada base
-        for base_id, ativos in ativos_por_base.items():
+        for base_id, ativos in zip(bases, np.split(ordem, inicios[1:])):
             equipes_base = np.where(y_jk[base_id, :] == 1)[0]
             
             if len(equipes_base) > 0:
@@ -108,16 +161,12 @@ class GeradorSolucoes:
                 ativos_por_equipe = len(ativos) // len(equipes_base)
                 resto = len(ativos) % len(equipes_base)
                 
-                ativo_idx = 0
-                for k_idx, k in enumerate(equipes_base):
-                    # Calcula quantos ativos esta equipe deve receber
-                    n_ativos_equipe = ativos_por_equipe + (1 if k_idx < resto else 0)
-                    
-                    # Atribui ativos à equipe
-                    for _ in range(n_ativos_equipe):
-                        if ativo_idx < len(ativos):
-                            h_ik[ativos[ativo_idx], k] = 1
-                            ativo_idx += 1
+                # Calcula quantos ativos cada equipe deve receber (as primeiras 'resto' recebem um a mais)
+                n_ativos_equipe = np.full(len(equipes_base), ativos_por_equipe)
+                n_ativos_equipe[:resto] += 1
+                
+                # Atribui ativos às equipes em blocos consecutivos, numa única escrita
+                h_ik[ativos, np.repeat(equipes_base, n_ativos_equipe)] = 1
         
         return h_ik
     
@@ -136,14 +185,14 @@ class GeradorSolucoes:
             h_ik: Atribuição de ativos às equipes
         """
         # Inicializa variáveis
-        x_ij = np.zeros((self.n_ativos, self.m_bases), dtype=int)
-        y_jk = np.zeros((self.m_bases, self.s_equipes), dtype=int)
-        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=int)
+        x_ij = np.zeros((self.n_ativos, self.m_bases), dtype=np.uint8)
+        y_jk = np.zeros((self.m_bases, self.s_equipes), dtype=np.uint8)
+        h_ik = np.zeros((self.n_ativos, self.s_equipes), dtype=np.uint8)
         
         # Determina número de equipes a usar
         if n_equipes_desejado is None:
             # Escolhe aleatoriamente entre 1 e s_equipes
-            n_equipes_desejado = np.random.randint(1, self.s_equipes + 1)
+            n_equipes_desejado = self.rng.integers(1, self.s_equipes + 1)
         else:
             n_equipes_desejado = max(1, min(n_equipes_desejado, self.s_equipes))
         
@@ -151,30 +200,24 @@ class GeradorSolucoes:
         bases_ordenadas = self._ordenar_bases_por_centralidade()
         
         # Passo 1: Aloca APENAS n_equipes_desejado equipes
-        equipes_usadas = list(range(n_equipes_desejado))
+        equipes_usadas = np.arange(n_equipes_desejado)
         
         if prioridade_f1:
             # Distribui equipes entre as bases mais centrais para minimizar distâncias
-            for k in equipes_usadas:
-                base_escolhida = bases_ordenadas[k % min(len(bases_ordenadas), 4)]
-                y_jk[base_escolhida, k] = 1
+            y_jk[bases_ordenadas[equipes_usadas % min(self.m_bases, 4)], equipes_usadas] = 1
         else:
             # Concentra todas em uma base central para minimizar número de equipes
-            base_central = bases_ordenadas[0]
-            for k in equipes_usadas:
-                y_jk[base_central, k] = 1
+            y_jk[bases_ordenadas[0], equipes_usadas] = 1
         
         # Passo 2: Atribui ativos às bases com equipes (prioriza proximidade)
-        for i in range(self.n_ativos):
-            bases_com_equipes = np.where(np.sum(y_jk, axis=1) > 0)[0]
-            
-            if len(bases_com_equipes) > 0:
-                # Escolhe a base mais próxima dentre as que têm equipes
-                distancias_validas = self.distancias[i, bases_com_equipes]
-                base_mais_proxima = bases_com_equipes[np.argmin(distancias_validas)]
-                x_ij[i, base_mais_proxima] = 1
+        bases_com_equipes = np.flatnonzero(y_jk.any(axis=1))
+        
+        if len(bases_com_equipes) > 0:
+            # Escolhe, para cada ativo, a base mais próxima dentre as que têm equipes
+            base_mais_proxima = bases_com_equipes[self.distancias[:, bases_com_equipes].argmin(axis=1)]
+            x_ij[np.arange(self.n_ativos), base_mais_proxima] = 1
         
         # Passo 3: Atribui ativos às equipes (balanceado, respeitando restrição eta)
-        h_ik = self._balancear_atribuicao_equipes(x_ij, y_jk)
+        self._balancear_atribuicao_equipes(x_ij, y_jk, out=h_ik)
         
         return x_ij, y_jk, h_ik
\ No newline at end of file
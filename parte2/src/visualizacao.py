@@ -50,6 +50,7 @@ class Visualizador:
         self.eta = monitoramento.eta
         self.distancias = monitoramento.distancias
         self.bases_coords = monitoramento.bases_coords
+        self.bases_coords_arr = monitoramento.bases_coords_arr
         self.dados = monitoramento.dados
         self.funcoes_objetivo = monitoramento.funcoes_objetivo
     
@@ -115,26 +116,29 @@ class Visualizador:
         # Adiciona nós das bases ocupadas (pentágonos verdes com cruz)
         bases_ativas = np.where(np.sum(y_jk, axis=1) > 0)[0]
         for j in bases_ativas:
-            lat, lon = self.bases_coords[j+1]
+            lat, lon = self.bases_coords_arr[j]
             G.add_node(f'Base_{j+1}', pos=(lon, lat), tipo='base_ocupada')
         
         # Adiciona nós das bases disponíveis (pentágonos brancos)
         bases_disponiveis = np.where(np.sum(y_jk, axis=1) == 0)[0]
         for j in bases_disponiveis:
-            lat, lon = self.bases_coords[j+1]
+            lat, lon = self.bases_coords_arr[j]
             G.add_node(f'Base_{j+1}', pos=(lon, lat), tipo='base_disponivel')
         
+        # Base de cada ativo (primeira coluna com 1 em x_ij), usada por todos os loops abaixo
+        bases_dos_ativos = (x_ij == 1).argmax(axis=1)
+        
         # Adiciona nós dos ativos (círculos roxos)
+        coords_ativos = self.dados[['lat_ativo', 'lon_ativo']].to_numpy()
         for i in range(self.n_ativos):
-            base_ativo = np.where(x_ij[i, :] == 1)[0][0]
+            base_ativo = bases_dos_ativos[i]
             if base_ativo in bases_ativas:
-                lat = self.dados.iloc[i]['lat_ativo']
-                lon = self.dados.iloc[i]['lon_ativo']
+                lat, lon = coords_ativos[i]
                 G.add_node(f'Ativo_{i}', pos=(lon, lat), tipo='ativo', base=base_ativo)
         
         # Adiciona arestas
         for i in range(self.n_ativos):
-            base_ativo = np.where(x_ij[i, :] == 1)[0][0]
+            base_ativo = bases_dos_ativos[i]
             if base_ativo in bases_ativas:
                 G.add_edge(f'Ativo_{i}', f'Base_{base_ativo+1}')
         
@@ -162,7 +166,7 @@ class Visualizador:
             ativos_por_base = {}
             
             for i in range(self.n_ativos):
-                base_ativo = np.where(x_ij[i, :] == 1)[0][0]
+                base_ativo = bases_dos_ativos[i]
                 if base_ativo in bases_ativas:
                     aresta = (f'Ativo_{i}', f'Base_{base_ativo+1}')
                     if base_ativo not in arestas_por_base:
@@ -196,7 +200,7 @@ class Visualizador:
             ativos_por_base = {}
             
             for i in range(self.n_ativos):
-                base_ativo = np.where(x_ij[i, :] == 1)[0][0]
+                base_ativo = bases_dos_ativos[i]
                 if base_ativo in bases_ativas:
                     aresta = (f'Ativo_{i}', f'Base_{base_ativo+1}')
                     if base_ativo not in arestas_por_base:
@@ -412,24 +416,24 @@ class Visualizador:
         # Plota bases
         bases_ativas = np.where(np.sum(y_jk, axis=1) > 0)[0]
         for j in bases_ativas:
-            lat, lon = self.bases_coords[j+1]
+            lat, lon = self.bases_coords_arr[j]
             ax.scatter(lon, lat, c='red', s=200, marker='s', 
                       label='Base' if j == bases_ativas[0] else "", alpha=0.8)
             ax.annotate(f'B{j+1}', (lon, lat), xytext=(5, 5), 
                        textcoords='offset points', fontsize=8, fontweight='bold')
         
-        # Plota ativos
+        # Plota ativos (coordenadas e cores tiradas uma vez, fora do loop)
+        coords_ativos = self.dados[['lat_ativo', 'lon_ativo']].to_numpy()
+        cores = plt.cm.Set3(np.linspace(0, 1, len(bases_ativas)))
+        tem_base = (x_ij == 1).any(axis=1)
+        bases_dos_ativos = (x_ij == 1).argmax(axis=1)
         for i in range(self.n_ativos):
-            base_ativo = np.where(x_ij[i, :] == 1)[0]
-            if len(base_ativo) > 0 and base_ativo[0] in bases_ativas:
+            if tem_base[i] and bases_dos_ativos[i] in bases_ativas:
                 # Encontra coordenadas do ativo
-                ativo_data = self.dados.iloc[i]
-                lat_ativo = ativo_data['lat_ativo']
-                lon_ativo = ativo_data['lon_ativo']
+                lat_ativo, lon_ativo = coords_ativos[i]
                 
                 # Cor baseada na base
-                cores = plt.cm.Set3(np.linspace(0, 1, len(bases_ativas)))
-                cor = cores[np.where(bases_ativas == base_ativo[0])[0][0]]
+                cor = cores[np.where(bases_ativas == bases_dos_ativos[i])[0][0]]
                 
                 ax.scatter(lon_ativo, lat_ativo, c=[cor], s=30, alpha=0.6)
         
@@ -500,16 +504,15 @@ class Visualizador:
             metodo: Nome do método ('Pw' ou 'Pe')
             arquivo_saida: Caminho para salvar a figura
         """
-        from src.funcoes_objetivo import nondominatedsolutions, selecionar_solucoes_distribuidas
+        from src.funcoes_objetivo import nd_sort_2d
         
-        # Encontra soluções não-dominadas
-        indices_nd = nondominatedsolutions(todas_solucoes)
+        # Encontra soluções não-dominadas, ordenadas por f1 (e f2 no empate)
+        indices_nd = nd_sort_2d(todas_solucoes)
         solucoes_nd = todas_solucoes[indices_nd]
         
-        # Seleciona até 20 soluções bem distribuídas
-        if len(indices_nd) > 20:
-            indices_selecionados = selecionar_solucoes_distribuidas(todas_solucoes, indices_nd, 20)
-            solucoes_finais = todas_solucoes[indices_selecionados]
+        # Seleciona até 20 soluções igualmente espaçadas ao longo da fronteira (inclui os extremos)
+        if len(solucoes_nd) > 20:
+            solucoes_finais = solucoes_nd[np.linspace(0, len(solucoes_nd) - 1, 20).astype(int)]
         else:
             solucoes_finais = solucoes_nd
         
@@ -527,11 +530,10 @@ class Visualizador:
         
         # Plota soluções finais (selecionadas) em vermelho
         if len(solucoes_finais) > 0:
-            solucoes_ordenadas = solucoes_finais[np.argsort(solucoes_finais[:, 0])]
-            ax.scatter(solucoes_ordenadas[:, 0], solucoes_ordenadas[:, 1], 
+            ax.scatter(solucoes_finais[:, 0], solucoes_finais[:, 1], 
                       s=120, alpha=0.9, color='red', label='Fronteira Final (~20 pontos)', 
                       edgecolors='black', linewidth=1.5, marker='D')
-            ax.plot(solucoes_ordenadas[:, 0], solucoes_ordenadas[:, 1], 
+            ax.plot(solucoes_finais[:, 0], solucoes_finais[:, 1], 
                    alpha=0.5, linestyle='-', color='red', linewidth=2)
         
         ax.set_xlabel('f1: Distância Total (km)', fontsize=13, fontweight='bold')